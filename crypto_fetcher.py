@@ -4,10 +4,18 @@
 支持 Upbit (업비트) 和 Bithumb (비썸)
 """
 import asyncio
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+import aiohttp
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Upbit
 try:
     import pyupbit
@@ -24,6 +32,13 @@ except ImportError:
     BITHUMB_AVAILABLE = False
     logger.error("pybithumb 未安装")
 
+# 全量行情 REST 接口（一次请求返回所有交易对）
+UPBIT_TICKER_URL = "https://api.upbit.com/v1/ticker"
+BITHUMB_TICKER_ALL_URL = "https://api.bithumb.com/public/ticker/ALL_KRW"
+
+# 交易对列表很少变化，缓存 10 分钟
+MARKETS_CACHE_TTL = 600
+
 
 class CryptoDataFetcher:
     """加密货币数据获取器"""
@@ -35,6 +50,12 @@ class CryptoDataFetcher:
         # 缓存
         self.upbit_markets_cache = None
         self.bithumb_markets_cache = None
+        self._upbit_markets_at = 0.0
+        self._bithumb_markets_at = 0.0
+        
+        # 全量行情共用一个 keep-alive 会话（首次使用时创建，须在事件循环内）
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._http_timeout = aiohttp.ClientTimeout(total=10)
         
         # 统计
         self.stats = {
@@ -48,6 +69,28 @@ class CryptoDataFetcher:
         logger.info(f"   Upbit: {'✅' if self.upbit_available else '❌'}")
         logger.info(f"   Bithumb: {'✅' if self.bithumb_available else '❌'}")
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """获取共用 HTTP 会话（复用 TLS 连接）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=8, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._http_timeout)
+        return self._session
+    
+    async def close(self):
+        """关闭共用 HTTP 会话"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Any:
+        """GET 并解析 JSON（有 orjson 时直接解析原始字节）"""
+        session = await self._get_session()
+        async with session.get(url, params=params) as response:
+            response.raise_for_status()
+            if ORJSON_AVAILABLE:
+                return orjson.loads(await response.read())
+            return await response.json()
+    
     # ==========================================
     # Upbit (업비트)
     # ==========================================
@@ -57,7 +100,7 @@ class CryptoDataFetcher:
         if not self.upbit_available:
             return []
         
-        if self.upbit_markets_cache:
+        if self.upbit_markets_cache and time.monotonic() - self._upbit_markets_at < MARKETS_CACHE_TTL:
             return self.upbit_markets_cache
         
         try:
@@ -65,6 +108,7 @@ class CryptoDataFetcher:
             all_markets = await asyncio.to_thread(pyupbit.get_tickers, fiat="KRW")
             
             self.upbit_markets_cache = all_markets
+            self._upbit_markets_at = time.monotonic()
             logger.info(f"✅ Upbit: 发现 {len(all_markets)} 个 KRW 交易对")
             
             return all_markets
@@ -139,50 +183,27 @@ class CryptoDataFetcher:
             
             logger.info(f"📊 Upbit: 开始获取 {len(markets)} 个交易对价格...")
             
-            # 批量获取当前价格
-            tickers = await asyncio.to_thread(pyupbit.get_current_price, markets)
-            
-            if not tickers:
-                return {}
+            # 一次请求取全部交易对的现价、昨收和当日成交量
+            self.stats['upbit_calls'] += 1
+            tickers = await self._get_json(UPBIT_TICKER_URL, {'markets': ','.join(markets)})
             
-            # 获取前一天收盘价（用于计算涨跌幅）
+            timestamp = datetime.now().isoformat()
             prices = {}
-            
-            for symbol, price in tickers.items():
-                if price is None:
-                    continue
-                
-                try:
-                    # 获取历史数据计算涨跌幅
-                    df = await asyncio.to_thread(
-                        pyupbit.get_ohlcv,
-                        symbol,
-                        interval="day",
-                        count=2
-                    )
-                    
-                    if df is not None and not df.empty and len(df) >= 2:
-                        prev_close = df.iloc[-2]['close']
-                        change_pct = ((price - prev_close) / prev_close) * 100
-                        volume = df.iloc[-1]['volume']
-                    else:
-                        change_pct = 0
-                        volume = 0
-                    
-                    prices[symbol] = {
-                        'symbol': symbol,
-                        'exchange': 'upbit',
-                        'price': float(price),
-                        'change': round(change_pct, 2),
-                        'volume': float(volume),
-                        'timestamp': datetime.now().isoformat(),
-                    }
-                    
-                    self.stats['upbit_success'] += 1
-                    
-                except Exception as e:
-                    logger.debug(f"Upbit {symbol} 处理失败: {e}")
+            for t in tickers:
+                price = t.get('trade_price')
+                if not price:
                     continue
+                prices[t['market']] = {
+                    'symbol': t['market'],
+                    'exchange': 'upbit',
+                    'price': float(price),
+                    'change': round(t.get('signed_change_rate', 0) * 100, 2),
+                    'volume': float(t.get('acc_trade_volume', 0)),
+                    'timestamp': timestamp,
+                }
+            
+            if prices:
+                self.stats['upbit_success'] += 1
             
             logger.info(f"✅ Upbit: 成功获取 {len(prices)} 个交易对价格")
             return prices
@@ -200,7 +221,7 @@ class CryptoDataFetcher:
         if not self.bithumb_available:
             return []
         
-        if self.bithumb_markets_cache:
+        if self.bithumb_markets_cache and time.monotonic() - self._bithumb_markets_at < MARKETS_CACHE_TTL:
             return self.bithumb_markets_cache
         
         try:
@@ -208,6 +229,7 @@ class CryptoDataFetcher:
             all_coins = await asyncio.to_thread(pybithumb.get_tickers)
             
             self.bithumb_markets_cache = all_coins
+            self._bithumb_markets_at = time.monotonic()
             logger.info(f"✅ Bithumb: 发现 {len(all_coins)} 个交易对")
             
             return all_coins
@@ -303,18 +325,38 @@ class CryptoDataFetcher:
             
             logger.info(f"📊 Bithumb: 开始获取 {len(markets)} 个交易对价格...")
             
-            prices = {}
-            
-            # Bithumb 批量获取
-            tasks = []
-            for symbol in markets:
-                tasks.append(self.get_bithumb_price(symbol))
+            # ALL_KRW 接口一次返回全部币种
+            self.stats['bithumb_calls'] += 1
+            payload = await self._get_json(BITHUMB_TICKER_ALL_URL)
+            data = payload.get('data') or {}
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            timestamp = datetime.now().isoformat()
+            prices = {}
+            for coin in markets:
+                row = data.get(coin)
+                if not isinstance(row, dict):
+                    continue
+                price = float(row.get('closing_price', 0))
+                if price <= 0:
+                    continue
+                prev_close = float(row.get('prev_closing_price', 0))
+                if prev_close > 0:
+                    change_pct = (price - prev_close) / prev_close * 100
+                else:
+                    change_pct = float(row.get('fluctate_rate_24H', 0))
+                
+                prices[f'KRW-{coin}'] = {
+                    'symbol':     f'KRW-{coin}',
+                    'exchange':   'bithumb',
+                    'price':      price,
+                    'change_pct': round(change_pct, 2),
+                    'change':     round(change_pct, 2),
+                    'volume':     float(row.get('units_traded_24H', 0)),
+                    'timestamp':  timestamp,
+                }
             
-            for symbol, result in zip(markets, results):
-                if isinstance(result, dict):
-                    prices[result['symbol']] = result
+            if prices:
+                self.stats['bithumb_success'] += 1
             
             logger.info(f"✅ Bithumb: 成功获取 {len(prices)} 个交易对价格")
             return prices
@@ -5,7 +5,9 @@
 """
 import os
 import sys
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from loguru import logger
@@ -29,11 +31,15 @@ except ImportError:
 
 from telegram_bot_standalone import OpenClawTelegramBot
 from openclaw.skills.execution.position_tracker import PositionTracker
+from openclaw.utils.helpers import run_in_pool, next_poll_delay
 
 
 class KoreanStockMonitor:
     """韩股实时监控器"""
     
+    PYKRX_WORKERS = 4
+    MAX_BACKOFF = 300  # 秒，连续轮询失败时的最长等待
+    
     def __init__(
         self,
         watch_list: List[str],
@@ -64,11 +70,17 @@ class KoreanStockMonitor:
         # 股票名称缓存
         self.stock_names = {}
         
+        # pykrx 调用走固定大小的线程池（线程数不随监控列表增长）
+        self._pykrx_pool = ThreadPoolExecutor(max_workers=self.PYKRX_WORKERS, thread_name_prefix='pykrx')
+        
         # 价格历史（用于计算涨跌幅）
         self.price_history: Dict[str, List[Dict]] = {}
         
-        # 上次告警时间（防止频繁告警）
-        self.last_alert_time: Dict[str, datetime] = {}
+        # 上次告警时间（防止频繁告警），monotonic 秒，不受系统时钟调整影响
+        self.last_alert_time: Dict[str, float] = {}
+        
+        # 连续失败轮询次数（成功即清零）
+        self._consec_fail = 0
         
         # 统计信息
         self.stats = {
@@ -94,8 +106,8 @@ class KoreanStockMonitor:
             return self.stock_names[symbol]
         
         try:
-            name = await asyncio.to_thread(
-                pykrx_stock.get_market_ticker_name, symbol
+            name = await run_in_pool(
+                self._pykrx_pool, pykrx_stock.get_market_ticker_name, symbol
             )
             if name:
                 self.stock_names[symbol] = name
@@ -116,8 +128,8 @@ class KoreanStockMonitor:
             days_ago_str = days_ago.strftime("%Y%m%d")
             
             # 从 pykrx 获取数据
-            df = await asyncio.to_thread(
-                pykrx_stock.get_market_ohlcv_by_date,
+            df = await run_in_pool(
+                self._pykrx_pool, pykrx_stock.get_market_ohlcv_by_date,
                 days_ago_str, today_str, symbol
             )
             
@@ -188,8 +200,7 @@ class KoreanStockMonitor:
         
         # 2. 检查是否在冷却期（避免频繁告警，5分钟内不重复）
         if symbol in self.last_alert_time:
-            time_since_last = datetime.now() - self.last_alert_time[symbol]
-            if time_since_last < timedelta(minutes=5):
+            if time.monotonic() - self.last_alert_time[symbol] < 300.0:
                 return False
         
         return True
@@ -229,8 +240,13 @@ class KoreanStockMonitor:
                     f"₩{price:,} ({change:+.2f}%)"
                 )
             
-            # 更新告警时间
-            self.last_alert_time[symbol] = datetime.now()
+            # 更新告警时间（顺带清理冷却已过的条目，避免字典无限增长）
+            now = time.monotonic()
+            if len(self.last_alert_time) > 4096:
+                self.last_alert_time = {
+                    s: t for s, t in self.last_alert_time.items() if now - t < 300.0
+                }
+            self.last_alert_time[symbol] = now
             self.stats['alerts_sent'] += 1
             
         except Exception as e:
@@ -268,12 +284,13 @@ class KoreanStockMonitor:
         
         while True:
             try:
-                loop_start = datetime.now()
+                loop_start = time.monotonic()
                 
                 # 1. 获取所有价格
                 prices = await self.get_all_prices()
                 
                 if prices:
+                    self._consec_fail = 0
                     self.stats['successful_polls'] += 1
                     
                     # 2. 更新价格历史
@@ -286,14 +303,14 @@ class KoreanStockMonitor:
                     # 4. 显示当前价格
                     self.display_current_prices(prices)
                 else:
+                    self._consec_fail += 1
                     self.stats['failed_polls'] += 1
                     logger.warning("本次轮询未获取到任何数据")
                 
                 self.stats['total_polls'] += 1
                 
-                # 5. 等待下次轮询
-                loop_duration = (datetime.now() - loop_start).total_seconds()
-                sleep_time = max(0, self.poll_interval - loop_duration)
+                # 5. 等待下次轮询（连续失败时退避）
+                sleep_time = next_poll_delay(self.poll_interval, self._consec_fail, loop_start, self.MAX_BACKOFF)
                 
                 if sleep_time > 0:
                     logger.info(f"⏳ 等待 {sleep_time:.1f}秒后继续...")
@@ -304,8 +321,9 @@ class KoreanStockMonitor:
                 break
             except Exception as e:
                 logger.error(f"监控循环错误: {e}")
+                self._consec_fail += 1
                 self.stats['failed_polls'] += 1
-                await asyncio.sleep(self.poll_interval)
+                await asyncio.sleep(next_poll_delay(self.poll_interval, self._consec_fail, loop_start, self.MAX_BACKOFF))
     
     def display_current_prices(self, prices: Dict[str, Dict[str, Any]]):
         """显示当前价格"""
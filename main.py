@@ -10,6 +10,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from openclaw.core.engine import OpenClawEngine
 from openclaw.utils.logger import setup_logger
+from openclaw.utils.helpers import run_async
 
 
 async def main():
@@ -37,4 +38,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_async(main())
@@ -3,7 +3,6 @@ Database manager for OpenClaw Trading System
 """
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-import json
 from loguru import logger
 
 try:
@@ -13,6 +12,25 @@ except ImportError:
     REDIS_AVAILABLE = False
     logger.warning("Redis not available, using in-memory cache")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    # Stored as raw bytes (Redis and the memory cache both accept them); int
+    # dict keys become strings, as with json
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    
+    _json_loads = orjson.loads
+else:
+    import json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 
 class DatabaseManager:
     """Manages database connections and operations"""
@@ -54,7 +72,7 @@ class DatabaseManager:
             True if successful
         """
         try:
-            serialized = json.dumps(value)
+            serialized = _json_dumps(value)
             
             if self.redis_client:
                 if expiry:
@@ -84,12 +102,12 @@ class DatabaseManager:
         try:
             if self.redis_client:
                 value = self.redis_client.get(key)
-                return json.loads(value) if value else None
+                return _json_loads(value) if value else None
             else:
                 cached = self.memory_cache.get(key)
                 if cached:
                     if cached['expiry'] is None or cached['expiry'] > datetime.now().timestamp():
-                        return json.loads(cached['value'])
+                        return _json_loads(cached['value'])
                     else:
                         del self.memory_cache[key]
                 return None
@@ -97,6 +115,59 @@ class DatabaseManager:
             logger.error(f"Failed to get key {key}: {e}")
             return None
     
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """
+        Get several values in one round trip
+        
+        Args:
+            keys: Cache keys
+        
+        Returns:
+            Stored values (None where missing), in key order
+        """
+        if not keys:
+            return []
+        
+        try:
+            if self.redis_client:
+                values = self.redis_client.mget(keys)
+                return [_json_loads(value) if value else None for value in values]
+            return [self.get(key) for key in keys]
+        except Exception as e:
+            logger.error(f"Failed to mget {len(keys)} keys: {e}")
+            return [None] * len(keys)
+    
+    def mset(self, mapping: Dict[str, Any], expiry: Optional[int] = None) -> bool:
+        """
+        Set several key-value pairs in one round trip
+        
+        Args:
+            mapping: Keys and values to store
+            expiry: Expiration time in seconds (applied to every key)
+        
+        Returns:
+            True if successful
+        """
+        if not mapping:
+            return True
+        
+        if not self.redis_client:
+            return all([self.set(key, value, expiry) for key, value in mapping.items()])
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                serialized = _json_dumps(value)
+                if expiry:
+                    pipe.setex(key, expiry, serialized)
+                else:
+                    pipe.set(key, serialized)
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to mset {len(mapping)} keys: {e}")
+            return False
+    
     def delete(self, key: str) -> bool:
         """
         Delete a key
@@ -31,6 +31,7 @@ from ..skills.analysis import (
 )
 from ..skills.execution import OrderManager, PositionTracker
 from ..skills.monitoring import SystemMonitor, AlertManager, AlertLevel
+from ..utils import api_client
 
 
 class OpenClawEngine:
@@ -423,5 +424,9 @@ class OpenClawEngine:
             "OpenClaw Trading Engine stopped",
             AlertLevel.INFO
         )
+        await self.alert_manager.close()
+        
+        # Close the HTTP connection pool shared by all APIClients
+        await api_client.shutdown()
         
         logger.info("✅ OpenClaw Engine stopped gracefully")
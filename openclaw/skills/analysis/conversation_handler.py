@@ -91,6 +91,13 @@ class ConversationHandler:
 
         # [补丁] 初始化推荐目标缓存，防止 AttributeError
         self._recommendation_targets: Dict[str, float] = {}
+
+        # 置顶摘要正文缓存：(现金 + 各标的数量/成本/现价, 正文)，输入都未变时直接复用
+        self._pin_body_cache: Tuple[Optional[tuple], str] = (None, "")
+
+        # 实时推送唤醒盈亏扫描（start_pnl_alert_loop 启动后才绑定事件循环）
+        self._price_tick: Optional[asyncio.Event] = None
+        self._price_tick_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # 初始化Gemini模型管理器
         if GEMINI_AVAILABLE and self.api_key:
@@ -110,7 +117,8 @@ class ConversationHandler:
     def _auto_save(self) -> None:
         """买卖/调仓后自动保存账户状态（仅当 _state_file 已设置时）。"""
         if self._state_file and self.tracker:
-            self.tracker.save_state(self._state_file)
+            # 交易路径在事件循环内：快照当场序列化，写盘交给 tracker 的后台线程
+            self.tracker.save_state_background(self._state_file)
 
     async def _handle_calc_query(self, user_message: str) -> str:
         """
@@ -1086,9 +1094,7 @@ class ConversationHandler:
             return response
             
         except Exception as e:
-            logger.error(f"处理消息失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"处理消息失败: {e}")
             return f"❌ 抱歉，处理您的请求时出错了: {str(e)}"
     
     async def _check_position_alerts(self) -> List[Dict[str, Any]]:
@@ -1285,7 +1291,7 @@ class ConversationHandler:
                                 'volume': float(_row.get('거래량', 0)),
                             })
 
-                elif sym.startswith('KRW-') or sym.startswith('USDT-'):
+                elif sym.startswith(('KRW-', 'USDT-')):
                     # 加密货币 → pyupbit 日线K线
                     try:
                         import pyupbit as _upbit
@@ -1577,7 +1583,7 @@ class ConversationHandler:
                         # Fallthrough to Upbit logic below
 
                 # ── Upbit K线获取 (默认或 Bithumb 失败回退) ──
-                if not candles and (sym.startswith('KRW-') or sym.startswith('USDT-')):
+                if not candles and (sym.startswith(('KRW-', 'USDT-'))):
                     # 5分钟线 × 96根 = 近8小时（加密货币24H交易，始终有数据）
                     import pyupbit as _upbit
                     try:
@@ -2246,9 +2252,7 @@ class ConversationHandler:
             return await self._execute_actions_if_needed(llm_text, user_message)
 
         except Exception as e:
-            logger.error(f"LLM处理失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"LLM处理失败: {e}")
             return f"❌ AI处理失败: {str(e)}"
 
     async def _build_realtime_pnl_summary(self) -> str:
@@ -2355,6 +2359,14 @@ class ConversationHandler:
                 if isinstance(r, dict) and r.get('price', 0) > 0:
                     _price_map[s] = r['price']
 
+            ts = _dt.now().strftime('%H:%M:%S')
+            key = (self.tracker.cash, tuple(
+                (s, p['quantity'], p['total_cost'], _price_map.get(s)) for s, p in positions.items()
+            ))
+            cached_key, body = self._pin_body_cache
+            if key == cached_key:
+                return f"{body}\n持仓动态（{ts}）"
+
             parts = []
             for sym, pos in positions.items():
                 # 使用精确的entry_price（从total_cost计算，避免四舍五入误差）
@@ -2370,16 +2382,25 @@ class ConversationHandler:
                 parts.append(f"{pnl_str} 持有{self._fmt_quantity(qty)}{short} ₩{val_str}")
             # 显示准确现金余额
             cash_str = self._fmt_price(self.tracker.cash)
-            ts = _dt.now().strftime('%H:%M:%S')
             positions_str = " | ".join(parts)
-            return f"{positions_str} 剩余：₩{cash_str}\n持仓动态（{ts}）"
+            body = f"{positions_str} 剩余：₩{cash_str}"
+            self._pin_body_cache = (key, body)
+            return f"{body}\n持仓动态（{ts}）"
         except Exception as e:
             logger.debug(f"_build_pinned_summary 失败: {e}")
             return ""
 
+    def _on_price_tick(self, symbol: str, price: float) -> None:
+        """Alpaca/FUTU 推送回调：持仓标的价格变化时唤醒盈亏扫描（可在任意线程调用）"""
+        loop = self._price_tick_loop
+        if loop is None or not self.tracker or symbol not in self.tracker.positions:
+            return
+        loop.call_soon_threadsafe(self._price_tick.set)
+
     async def start_pnl_alert_loop(self, send_fn, interval: int = 5):
         """
-        高频盈亏告警循环（每1秒扫描，按盈亏档位控制推送频率）：
+        高频盈亏告警循环（持仓标的有实时推送时立即扫描，否则每 interval 秒兜底轮询，
+        两次扫描至少间隔1秒；按盈亏档位控制推送频率）：
           +1～+5%   : 3分钟一次
           +6～+10%  : 30秒一次
           +11～+15% : 10秒一次
@@ -2428,13 +2449,29 @@ class ConversationHandler:
         # {sym: target_alert_sent_ts}，记录目标价告警发送时间，用于降低后续档位告警频率
         _target_alert_sent: dict = {}
         
-        # 默认5秒扫描；当任一仓位触达 ≥+15% 或 ≤-10% 极端档时降为1秒
+        # 默认 interval 秒扫描；当任一仓位触达 ≥+15% 或 ≤-10% 极端档时降为1秒
         _high_freq: bool = False
 
+        # 美股/港股持仓：Alpaca/FUTU 推送到价即唤醒，不必等满轮询周期
+        self._price_tick = asyncio.Event()
+        self._price_tick_loop = asyncio.get_running_loop()
+        if self.us_hk_fetcher and hasattr(self.us_hk_fetcher, 'set_price_listener'):
+            self.us_hk_fetcher.set_price_listener(self._on_price_tick)
+        _last_scan = 0.0
+
         while True:
             # 如果处于急速下跌监控状态（有最近触发过下跌告警），也保持1秒扫描
             # 但这里简单起见，只要检测到急速下跌，下一轮自然会更快捕获
-            await asyncio.sleep(1 if _high_freq else 5)
+            try:
+                await asyncio.wait_for(self._price_tick.wait(), timeout=1 if _high_freq else interval)
+            except asyncio.TimeoutError:
+                pass
+            # 推送密集时合并唤醒：两次扫描至少间隔1秒（急速下跌按相邻两轮比较）
+            _gap = _ti.monotonic() - _last_scan
+            if _gap < 1:
+                await asyncio.sleep(1 - _gap)
+            self._price_tick.clear()
+            _last_scan = _ti.monotonic()
             _high_freq = False   # 每轮重置，扫描中若发现极端档位再置True
             
             try:
@@ -3399,7 +3436,7 @@ class ConversationHandler:
             # 2. 已经是标准格式（6位数字/KRW-XXX/字母Ticker）直接返回
             if symbol.isdigit() and len(symbol) == 6:
                 return symbol
-            if symbol.upper().startswith('KRW-') or symbol.upper().startswith('USDT-'):
+            if symbol.upper().startswith(('KRW-', 'USDT-')):
                 return symbol
             if symbol.isalpha() and symbol.isupper() and len(symbol) <= 10:
                 # 短字母ticker：优先尝试作为加密货币（KRW-前缀）
@@ -3863,7 +3900,7 @@ class ConversationHandler:
         """
 
         # 1. 加密货币（KRW-BTC, USDT-BTC等）
-        if symbol.startswith('KRW-') or symbol.startswith('USDT-'):
+        if symbol.startswith(('KRW-', 'USDT-')):
             # 实时查询（Bithumb 优先，其次 Upbit）
             if self.crypto_fetcher:
                 try:
@@ -4823,9 +4860,7 @@ INTENT|CONFIDENCE
             return result
             
         except Exception as e:
-            logger.error(f"生成推荐失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"生成推荐失败: {e}")
             return f"❌ 生成推荐失败: {str(e)}"
     
     async def _handle_run_backtest(self, intent: Dict[str, Any]) -> str:
@@ -4899,9 +4934,7 @@ INTENT|CONFIDENCE
             return report
         
         except Exception as e:
-            logger.error(f"回测失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"回测失败: {e}")
             return f"❌ 回测失败: {str(e)}"
     
     def _extract_backtest_params(self, message: str) -> Dict[str, Any]:
@@ -115,6 +115,9 @@ class RiskManagement:
         """
         Calculate stop loss price
         
+        Prices may also be NumPy arrays (one entry per position); the stops
+        are then computed element-wise in a single call.
+        
         Args:
             entry_price: Entry price
             current_price: Current price (for trailing stop)
@@ -123,7 +126,7 @@ class RiskManagement:
         Returns:
             Stop loss price
         """
-        if self.stop_loss_type == 'trailing' and highest_price:
+        if self.stop_loss_type == 'trailing' and highest_price is not None:
             stop_loss = highest_price * (1 - self.stop_loss_pct)
         else:
             stop_loss = entry_price * (1 - self.stop_loss_pct)
@@ -134,6 +137,8 @@ class RiskManagement:
         """
         Calculate take profit price
         
+        entry_price may also be a NumPy array of entry prices.
+        
         Args:
             entry_price: Entry price
         
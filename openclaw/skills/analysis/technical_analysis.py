@@ -6,6 +6,58 @@ import numpy as np
 from typing import List, Dict, Any, Tuple
 from loguru import logger
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Largest calculate_ma period that uses np.convolve rather than prefix sums
+_CONVOLVE_MAX_WINDOW = 32
+
+# analyze_trend labels indexed by sign of the normalised slope + 1
+_TREND_LABELS = ("downtrend", "sideways", "uptrend")
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _rsi_kernel(prices: np.ndarray, period: int) -> float:
+        """Simple-average RSI over the last ``period`` changes"""
+        gain = 0.0
+        loss = 0.0
+        start = prices.shape[0] - period
+        for i in range(start, prices.shape[0]):
+            delta = prices[i] - prices[i - 1]
+            if delta > 0:
+                gain += delta
+            else:
+                loss -= delta
+        
+        if loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+    
+    @njit(cache=True, fastmath=True)
+    def _bollinger_kernel(prices: np.ndarray, period: int, std_dev: float) -> Tuple[float, float, float]:
+        """Single-pass (Welford) mean/std over the last ``period`` prices"""
+        mean = 0.0
+        m2 = 0.0
+        start = prices.shape[0] - period
+        for n in range(period):
+            x = prices[start + n]
+            delta = x - mean
+            mean += delta / (n + 1)
+            m2 += delta * (x - mean)
+        
+        std = (m2 / period) ** 0.5
+        return mean + std_dev * std, mean, mean - std_dev * std
+    
+    # Compile now so the first real call doesn't pay the JIT cost
+    _warmup = np.arange(1.0, 22.0)
+    _rsi_kernel(_warmup, 14)
+    _bollinger_kernel(_warmup, 20, 2.0)
+    del _warmup
+
 
 class TechnicalAnalysis:
     """Technical indicators calculator"""
@@ -173,12 +225,18 @@ class TechnicalAnalysis:
         if len(prices) < period:
             return []
         
-        ma_values = []
-        for i in range(period - 1, len(prices)):
-            ma = sum(prices[i - period + 1:i + 1]) / period
-            ma_values.append(ma)
+        arr = np.asarray(prices, dtype=np.float64)
         
-        return ma_values
+        # Small windows: convolution sums each window exactly in one C pass.
+        # Large windows: prefix sums keep it O(n) instead of O(n * period).
+        if period <= _CONVOLVE_MAX_WINDOW:
+            window_sums = np.convolve(arr, np.ones(period), mode='valid')
+        else:
+            csum = np.empty(arr.size + 1)
+            csum[0] = 0.0
+            np.cumsum(arr, out=csum[1:])
+            window_sums = csum[period:] - csum[:-period]
+        return (window_sums / period).tolist()
     
     @staticmethod
     def calculate_ema(prices: List[float], period: int) -> List[float]:
@@ -224,14 +282,14 @@ class TechnicalAnalysis:
         if len(prices) < period + 1:
             return 50.0
         
-        # Calculate price changes
-        deltas = np.diff(prices[-period - 1:])
+        if NUMBA_AVAILABLE:
+            return float(_rsi_kernel(np.asarray(prices[-period - 1:], dtype=np.float64), period))
         
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        # Calculate price changes
+        deltas = np.diff(np.asarray(prices[-period - 1:], dtype=np.float64))
         
-        avg_gain = np.mean(gains)
-        avg_loss = np.mean(losses)
+        avg_gain = np.maximum(deltas, 0).mean()
+        avg_loss = np.maximum(-deltas, 0).mean()
         
         if avg_loss == 0:
             return 100.0
@@ -312,15 +370,18 @@ class TechnicalAnalysis:
                 "lower": current_price
             }
         
-        recent_prices = prices[-period:]
-        middle_band = sum(recent_prices) / period
+        recent_prices = np.asarray(prices[-period:], dtype=np.float64)
         
-        # Calculate standard deviation
-        variance = sum((p - middle_band) ** 2 for p in recent_prices) / period
-        std = variance ** 0.5
-        
-        upper_band = middle_band + (std_dev * std)
-        lower_band = middle_band - (std_dev * std)
+        if NUMBA_AVAILABLE:
+            upper_band, middle_band, lower_band = _bollinger_kernel(recent_prices, period, std_dev)
+        else:
+            middle_band = float(recent_prices.mean())
+            
+            # Population standard deviation over the window
+            std = float(recent_prices.std())
+            
+            upper_band = middle_band + (std_dev * std)
+            lower_band = middle_band - (std_dev * std)
         
         return {
             "upper": upper_band,
@@ -389,23 +450,19 @@ class TechnicalAnalysis:
         if len(prices) < period:
             return "insufficient_data"
         
-        recent_prices = prices[-period:]
+        recent_prices = np.asarray(prices[-period:], dtype=np.float64)
         
-        # Simple linear regression
-        x = np.arange(len(recent_prices))
-        coeffs = np.polyfit(x, recent_prices, deg=1)
-        slope = coeffs[0]
+        # Least-squares slope against x = 0..n-1 in closed form (x is centred,
+        # so sum(x - mean) * y needs no centring of y)
+        n = recent_prices.size
+        x = np.arange(n) - (n - 1) / 2
+        slope = np.dot(x, recent_prices) / (n * (n * n - 1) / 12)
         
         # Determine trend
-        avg_price = np.mean(recent_prices)
+        avg_price = recent_prices.mean()
         slope_pct = (slope / avg_price) * 100
         
-        if slope_pct > 0.5:
-            return "uptrend"
-        elif slope_pct < -0.5:
-            return "downtrend"
-        else:
-            return "sideways"
+        return _TREND_LABELS[int(slope_pct > 0.5) - int(slope_pct < -0.5) + 1]
     
     @staticmethod
     def calculate_volatility(prices: List[float], period: int = 20) -> float:
@@ -20,7 +20,7 @@ import asyncio
 import json
 import os
 import time
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set
 from loguru import logger
 
 try:
@@ -73,6 +73,8 @@ class AlpacaWSClient:
         self._running   = False
         self._task: Optional[asyncio.Task] = None
         self._reconnect_delay = 2  # 初始重连延迟（秒）
+        # 价格更新回调 (symbol, price)，在事件循环线程内调用，须轻量且不阻塞
+        self.on_price: Optional[Callable[[str, float], None]] = None
 
         self.available = bool(
             api_key and secret_key and api_key != "your_alpaca_api_key" and WEBSOCKETS_AVAILABLE
@@ -313,6 +315,12 @@ class AlpacaWSClient:
                 "source":     "Alpaca-WS-Bar",
             }
 
+        else:
+            return
+
+        if self.on_price:
+            self.on_price(sym, self._price_cache[sym]["price"])
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # 简单测试（直接执行时可用）
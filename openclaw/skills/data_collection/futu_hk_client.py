@@ -23,7 +23,7 @@
 import os
 import threading
 import time
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from loguru import logger
 
 try:
@@ -51,11 +51,12 @@ def _from_futu_code(futu_code: str) -> str:
 class _QuoteHandler(ft.StockQuoteHandlerBase if FUTU_AVAILABLE else object):
     """FUTU 实时报价回调（逐笔快照，约 3 秒一次推送）"""
 
-    def __init__(self, cache: dict, prev_close_map: dict):
+    def __init__(self, cache: dict, prev_close_map: dict, notify: Optional[Callable[[str, float], None]] = None):
         if FUTU_AVAILABLE:
             super().__init__()
         self._cache         = cache
         self._prev_close    = prev_close_map
+        self._notify        = notify
 
     def on_recv_rsp(self, rsp_str):
         try:
@@ -80,6 +81,8 @@ class _QuoteHandler(ft.StockQuoteHandlerBase if FUTU_AVAILABLE else object):
                     'ts':         time.time(),
                     'source':     'FUTU-WS',
                 }
+                if self._notify:
+                    self._notify(code, price)
             return ret, data
         except Exception as e:
             logger.debug(f"[FUTU] QuoteHandler 处理异常: {e}")
@@ -89,11 +92,12 @@ class _QuoteHandler(ft.StockQuoteHandlerBase if FUTU_AVAILABLE else object):
 class _TickerHandler(ft.TickerHandlerBase if FUTU_AVAILABLE else object):
     """FUTU 逐笔成交回调（每笔真实成交立即推送，延迟最低）"""
 
-    def __init__(self, cache: dict, prev_close_map: dict):
+    def __init__(self, cache: dict, prev_close_map: dict, notify: Optional[Callable[[str, float], None]] = None):
         if FUTU_AVAILABLE:
             super().__init__()
         self._cache      = cache
         self._prev_close = prev_close_map
+        self._notify     = notify
 
     def on_recv_rsp(self, rsp_str):
         try:
@@ -119,6 +123,8 @@ class _TickerHandler(ft.TickerHandlerBase if FUTU_AVAILABLE else object):
                     'ts':         time.time(),
                     'source':     'FUTU-WS-Ticker',
                 }
+                if self._notify:
+                    self._notify(code, price)
             return ret, data
         except Exception as e:
             logger.debug(f"[FUTU] TickerHandler 处理异常: {e}")
@@ -142,6 +148,8 @@ class FutuHKClient:
         self._quote_ctx = None
         self._running   = False
         self._thread:   Optional[threading.Thread] = None
+        # 价格更新回调 (symbol, price)，在 FUTU 回调线程内调用，须线程安全且不阻塞
+        self.on_price: Optional[Callable[[str, float], None]] = None
 
         self.available = FUTU_AVAILABLE
 
@@ -264,6 +272,11 @@ class FutuHKClient:
     def is_running(self) -> bool:
         return self._running and self._thread is not None and self._thread.is_alive()
 
+    def _notify_price(self, futu_code: str, price: float) -> None:
+        """推送回调里转发价格更新（HK.00700 → 00700）"""
+        if self.on_price:
+            self.on_price(_from_futu_code(futu_code), price)
+
     # ─────────────────────────────────────────────────────────
     # 内部：后台线程
     # ─────────────────────────────────────────────────────────
@@ -287,8 +300,8 @@ class FutuHKClient:
         self._quote_ctx = ctx
 
         # 注册回调
-        ctx.set_handler(_QuoteHandler(self._price_cache, self._prev_close))
-        ctx.set_handler(_TickerHandler(self._price_cache, self._prev_close))
+        ctx.set_handler(_QuoteHandler(self._price_cache, self._prev_close, self._notify_price))
+        ctx.set_handler(_TickerHandler(self._price_cache, self._prev_close, self._notify_price))
 
         # 获取前收盘价（通过快照）并写入 prev_close
         if self._subscribed:
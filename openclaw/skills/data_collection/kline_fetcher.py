@@ -57,7 +57,7 @@ class KlineFetcher:
     def _is_us_stock(symbol: str) -> bool:
         """判断是否是美股代码（纯字母且非加密货币前缀）"""
         s = symbol.upper()
-        if s.startswith('KRW-') or s.startswith('BTC') or s.startswith('ETH'):
+        if s.startswith(('KRW-', 'BTC', 'ETH')):
             return False
         if symbol.isdigit():
             return False
@@ -8,7 +8,7 @@
 """
 import asyncio
 import os
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from loguru import logger
 
 try:
@@ -166,6 +166,19 @@ class USHKStockFetcher:
         ]
         self.futu_client.start(target)
 
+    def set_price_listener(self, callback: Optional[Callable[[str, float], None]]) -> None:
+        """
+        注册实时价格回调，Alpaca / FUTU 每次推送价格时调用 callback(symbol, price)。
+        FUTU 回调来自其后台线程，callback 需线程安全。
+
+        Args:
+            callback: 回调函数，传 None 取消注册
+        """
+        if self.alpaca_ws:
+            self.alpaca_ws.on_price = callback
+        if self.futu_client:
+            self.futu_client.on_price = callback
+
     def _format_hk_symbol(self, symbol: str) -> str:
         """格式化港股符号（yfinance格式）
         
@@ -2,10 +2,20 @@
 Position tracker for portfolio management
 """
 from typing import Dict, List, Any, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+import asyncio
+import json
+import os
 import numpy as np
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 class PositionTracker:
     """Tracks positions and portfolio performance"""
@@ -24,6 +34,8 @@ class PositionTracker:
         self.closed_positions: List[Dict[str, Any]] = []
         self.trade_history: List[Dict[str, Any]] = []
         self.alert_callback = alert_callback
+        self.version = 0  # Bumped whenever positions change (lets readers cache derived data)
+        self._save_executor: Optional[ThreadPoolExecutor] = None  # 后台写盘（单线程，按提交顺序）
         
         # 严格风控参数（强制执行）
         self.STOP_LOSS_PCT = -10.0  # 止损红线：-10%
@@ -63,6 +75,9 @@ class PositionTracker:
                 "available": self.cash,
             }
         
+        now = datetime.now().isoformat()
+        self.version += 1
+        
         if symbol in self.positions:
             # Add to existing position (average price)
             position = self.positions[symbol]
@@ -73,7 +88,7 @@ class PositionTracker:
             position['quantity'] = total_quantity
             position['avg_entry_price'] = avg_price
             position['total_cost'] = total_cost
-            position['updated_at'] = datetime.now().isoformat()
+            position['updated_at'] = now
             
             # 重新计算止损位
             position['stop_loss_price'] = avg_price * (1 + self.STOP_LOSS_PCT / 100)
@@ -104,8 +119,8 @@ class PositionTracker:
                 "quantity": quantity,
                 "avg_entry_price": entry_price,
                 "total_cost": cost,
-                "opened_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
+                "opened_at": now,
+                "updated_at": now,
                 "highest_price": entry_price,
                 "order_id": order_id,
                 # 强制风控参数
@@ -125,7 +140,7 @@ class PositionTracker:
             "quantity": quantity,
             "price": entry_price,
             "cost": cost,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         })
         
         logger.info(f"Opened position: {quantity} {symbol} @ {entry_price}")
@@ -163,6 +178,8 @@ class PositionTracker:
             logger.warning(f"Quantity exceeds position size for {symbol}")
             return {"success": False, "reason": "insufficient_quantity"}
         
+        now = datetime.now().isoformat()
+        
         # Calculate P&L
         revenue = quantity * exit_price
         cost_basis = quantity * position['avg_entry_price']
@@ -181,7 +198,7 @@ class PositionTracker:
             "pnl": pnl,
             "pnl_pct": pnl_pct,
             "opened_at": position['opened_at'],
-            "closed_at": datetime.now().isoformat(),
+            "closed_at": now,
             "order_id": order_id
         }
         
@@ -194,17 +211,18 @@ class PositionTracker:
             "price": exit_price,
             "revenue": revenue,
             "pnl": pnl,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now
         })
         
         # Update or remove position
+        self.version += 1
         if quantity == position['quantity']:
             del self.positions[symbol]
             logger.info(f"Closed full position: {quantity} {symbol} @ {exit_price}, P&L: {pnl:.2f} ({pnl_pct:.2f}%)")
         else:
             position['quantity'] -= quantity
             position['total_cost'] -= cost_basis
-            position['updated_at'] = datetime.now().isoformat()
+            position['updated_at'] = now
             logger.info(f"Partially closed position: {quantity} {symbol} @ {exit_price}, P&L: {pnl:.2f} ({pnl_pct:.2f}%)")
         
         return {"success": True, "closed_position": closed_position}
@@ -242,12 +260,21 @@ class PositionTracker:
         Returns:
             Total portfolio value
         """
-        position_value = sum(
-            pos['quantity'] * current_prices.get(pos['symbol'], pos['avg_entry_price'])
-            for pos in self.positions.values()
+        n = len(self.positions)
+        if n == 0:
+            return self.cash
+        
+        # Gather into contiguous arrays and value the book with one dot product
+        get_price = current_prices.get
+        quantities = np.fromiter(
+            (pos['quantity'] for pos in self.positions.values()), dtype=np.float64, count=n
+        )
+        prices = np.fromiter(
+            (get_price(symbol, pos['avg_entry_price']) for symbol, pos in self.positions.items()),
+            dtype=np.float64, count=n
         )
         
-        return self.cash + position_value
+        return self.cash + float(quantities @ prices)
     
     def calculate_unrealized_pnl(self, current_prices: Dict[str, float]) -> Dict[str, Any]:
         """
@@ -433,37 +460,37 @@ class PositionTracker:
         realized_pnl = self.calculate_realized_pnl()
         unrealized = self.calculate_unrealized_pnl(current_prices)
         
-        # Calculate win rate
-        winning_trades = [p for p in self.closed_positions if p['pnl'] > 0]
-        win_rate = len(winning_trades) / len(self.closed_positions) * 100 if self.closed_positions else 0
-        
-        # Calculate Sharpe ratio (simplified)
-        if self.closed_positions:
-            returns = [p['pnl_pct'] for p in self.closed_positions]
-            avg_return = np.mean(returns)
-            std_return = np.std(returns)
-            sharpe_ratio = (avg_return / std_return) if std_return > 0 else 0
+        # Closed-trade P&L as arrays (one pass over the records)
+        n_closed = len(self.closed_positions)
+        if n_closed:
+            pnls = np.fromiter((p['pnl'] for p in self.closed_positions), dtype=np.float64, count=n_closed)
+            returns = np.fromiter((p['pnl_pct'] for p in self.closed_positions), dtype=np.float64, count=n_closed)
+            
+            # Calculate win rate
+            win_rate = np.count_nonzero(pnls > 0) / n_closed * 100
+            
+            # Calculate Sharpe ratio (simplified)
+            std_return = returns.std()
+            sharpe_ratio = (returns.mean() / std_return) if std_return > 0 else 0
         else:
+            win_rate = 0
             sharpe_ratio = 0
         
-        # Calculate max drawdown
-        equity_curve = [self.initial_capital]
-        running_capital = self.initial_capital
-        
-        for trade in self.trade_history:
-            if trade['action'] == 'CLOSE':
-                running_capital += trade['pnl']
-                equity_curve.append(running_capital)
-        
-        peak = equity_curve[0]
-        max_drawdown = 0
+        # Calculate max drawdown over the equity curve of closing trades
+        close_pnls = np.fromiter(
+            (trade['pnl'] for trade in self.trade_history if trade['action'] == 'CLOSE'),
+            dtype=np.float64,
+        )
+        equity_curve = np.empty(close_pnls.size + 1)
+        equity_curve[0] = self.initial_capital
+        np.cumsum(close_pnls, out=equity_curve[1:])
+        equity_curve[1:] += self.initial_capital
         
-        for value in equity_curve:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak * 100
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
+        peaks = np.maximum.accumulate(equity_curve)
+        drawdowns = np.zeros_like(equity_curve)
+        np.divide(peaks - equity_curve, peaks, out=drawdowns, where=peaks != 0)
+        drawdowns *= 100
+        max_drawdown = float(drawdowns.max())
         
         return {
             "portfolio_value": portfolio_value,
@@ -483,22 +510,30 @@ class PositionTracker:
     # 状态持久化：保存 / 加载
     # ──────────────────────────────────────────────────────────
 
-    def save_state(self, filepath: str) -> bool:
-        """将账户状态序列化为 JSON 文件，重启后可恢复。"""
-        import json, os
+    def _serialize_state(self) -> bytes:
+        """账户状态快照序列化为 JSON 字节（在调用线程完成，保证快照一致）"""
+        state = {
+            'initial_capital': self.initial_capital,
+            'cash': self.cash,
+            'positions': self.positions,
+            'closed_positions': self.closed_positions,
+            'trade_history': self.trade_history[-200:],  # 最多保留最近200条
+            'saved_at': datetime.now().isoformat(),
+        }
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(
+                state, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY, default=str
+            )
+        return json.dumps(state, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+
+    @staticmethod
+    def _write_state(filepath: str, data: bytes) -> bool:
+        """原子写入已序列化的状态"""
         try:
-            state = {
-                'initial_capital': self.initial_capital,
-                'cash': self.cash,
-                'positions': self.positions,
-                'closed_positions': self.closed_positions,
-                'trade_history': self.trade_history[-200:],  # 最多保留最近200条
-                'saved_at': datetime.now().isoformat(),
-            }
             os.makedirs(os.path.dirname(filepath), exist_ok=True)
             tmp = filepath + '.tmp'
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(state, f, ensure_ascii=False, indent=2, default=str)
+            with open(tmp, 'wb') as f:
+                f.write(data)
             os.replace(tmp, filepath)  # 原子替换，避免写一半崩溃
             logger.info(f'💾 账户状态已保存: {filepath}')
             return True
@@ -506,17 +541,50 @@ class PositionTracker:
             logger.error(f'账户状态保存失败: {e}')
             return False
 
+    def save_state(self, filepath: str) -> bool:
+        """将账户状态序列化为 JSON 文件，重启后可恢复。"""
+        try:
+            data = self._serialize_state()
+        except Exception as e:
+            logger.error(f'账户状态保存失败: {e}')
+            return False
+        return self._write_state(filepath, data)
+
+    def save_state_background(self, filepath: str) -> Future:
+        """
+        立即取快照，写盘交给后台线程（事件循环内调用不阻塞）。
+        多次调用按提交顺序落盘，较新的快照不会被旧的覆盖。
+        """
+        try:
+            data = self._serialize_state()
+        except Exception as e:
+            logger.error(f'账户状态保存失败: {e}')
+            done: Future = Future()
+            done.set_result(False)
+            return done
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='state-save')
+        return self._save_executor.submit(self._write_state, filepath, data)
+
+    async def asave_state(self, filepath: str) -> bool:
+        """save_state 的异步版本（写盘在后台线程，等待其完成）"""
+        return await asyncio.wrap_future(self.save_state_background(filepath))
+
     def load_state(self, filepath: str) -> bool:
         """从 JSON 文件恢复账户状态。返回 True 表示成功加载。"""
-        import json, os
         if not os.path.exists(filepath):
             return False
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                state = json.load(f)
+            if ORJSON_AVAILABLE:
+                with open(filepath, 'rb') as f:
+                    state = orjson.loads(f.read())
+            else:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
             self.initial_capital = float(state.get('initial_capital', self.initial_capital))
             self.cash = float(state.get('cash', self.initial_capital))
             self.positions = state.get('positions', {})
+            self.version += 1
             self.closed_positions = state.get('closed_positions', [])
             self.trade_history = state.get('trade_history', [])
             saved_at = state.get('saved_at', '?')
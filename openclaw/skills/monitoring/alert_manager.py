@@ -323,6 +323,11 @@ class AlertManager:
         
         return alert
     
+    async def close(self):
+        """Release the currency converter's HTTP session (recreated on next use)"""
+        if self.currency_converter:
+            await self.currency_converter.close()
+    
     # Helper methods for KRW formatting
     
     async def _convert_price(self, symbol: str, price: float) -> float:
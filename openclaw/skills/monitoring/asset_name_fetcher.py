@@ -6,6 +6,11 @@ import aiohttp
 import asyncio
 from loguru import logger
 from openclaw.core.database import DatabaseManager
+from openclaw.utils.helpers import TTLCache
+
+
+_KR_SUFFIXES = ('.KS', '.KQ')
+_UPBIT_PREFIX = 'KRW-'
 
 
 class AssetNameFetcher:
@@ -43,6 +48,8 @@ class AssetNameFetcher:
     }
     
     CACHE_TTL = 86400  # 24 hours in seconds
+    L1_CACHE_TTL = 3600  # In-process cache in front of Redis
+    MAX_CONCURRENCY = 32  # Concurrent API lookups per batch
     
     def __init__(self, db_manager: Optional[DatabaseManager] = None):
         """
@@ -54,6 +61,7 @@ class AssetNameFetcher:
         self.db = db_manager or DatabaseManager()
         self.session: Optional[aiohttp.ClientSession] = None
         self._crypto_cache: Dict[str, str] = {}  # In-memory cache for CoinGecko list
+        self._l1 = TTLCache(maxsize=4096, ttl=self.L1_CACHE_TTL)  # symbol -> name
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -74,21 +82,20 @@ class AssetNameFetcher:
         symbol = symbol.upper().strip()
         
         # Handle Upbit format (KRW-BTC -> BTC)
-        if symbol.startswith('KRW-'):
-            symbol = symbol[4:]
+        if symbol.startswith(_UPBIT_PREFIX):
+            return symbol[len(_UPBIT_PREFIX):]
         
         return symbol
     
     def _is_korean_stock(self, symbol: str) -> bool:
         """Check if symbol is a Korean stock"""
-        return symbol.endswith('.KS') or symbol.endswith('.KQ')
+        return symbol.endswith(_KR_SUFFIXES)
     
     def _is_crypto(self, symbol: str) -> bool:
         """Check if symbol is a cryptocurrency"""
-        normalized = self._normalize_symbol(symbol)
-        # Check if it's a known crypto or not a stock
-        return (normalized in self.CRYPTO_FALLBACK or 
-                not self._is_korean_stock(symbol))
+        # Anything that isn't a stock is crypto; only normalize for the rare stock-suffixed case
+        return (not self._is_korean_stock(symbol) or
+                self._normalize_symbol(symbol) in self.CRYPTO_FALLBACK)
     
     async def _fetch_korean_stock_name(self, symbol: str) -> Optional[str]:
         """
@@ -192,22 +199,16 @@ class AssetNameFetcher:
         # Look up the name
         return crypto_map.get(normalized)
     
-    async def get_asset_name(self, symbol: str) -> str:
+    async def _resolve_name(self, symbol: str) -> str:
         """
-        Get full asset name with caching
+        Look up a name from the APIs, falling back to local mappings
         
         Args:
             symbol: Asset symbol
         
         Returns:
-            Full asset name (e.g., 'Samsung Electronics Co., Ltd.')
+            Full asset name, or a placeholder if it couldn't be found
         """
-        # Check cache first
-        cache_key = self._get_cache_key(symbol)
-        cached_name = self.db.get(cache_key)
-        if cached_name:
-            return cached_name
-        
         name = None
         
         # Determine asset type and fetch name
@@ -233,7 +234,33 @@ class AssetNameFetcher:
             name = f"Unknown Asset ({symbol}). Please verify the symbol format."
             logger.warning(f"Could not fetch name for {symbol}, using default. Symbol format may be incorrect.")
         
+        return name
+    
+    async def get_asset_name(self, symbol: str) -> str:
+        """
+        Get full asset name with caching
+        
+        Args:
+            symbol: Asset symbol
+        
+        Returns:
+            Full asset name (e.g., 'Samsung Electronics Co., Ltd.')
+        """
+        # Check in-process cache, then Redis
+        name = self._l1.get(symbol)
+        if name:
+            return name
+        
+        cache_key = self._get_cache_key(symbol)
+        cached_name = self.db.get(cache_key)
+        if cached_name:
+            self._l1.set(symbol, cached_name)
+            return cached_name
+        
+        name = await self._resolve_name(symbol)
+        
         # Cache the result
+        self._l1.set(symbol, name)
         self.db.set(cache_key, name, expiry=self.CACHE_TTL)
         
         return name
@@ -242,15 +269,54 @@ class AssetNameFetcher:
         """
         Batch fetch asset names
         
+        Cache lookups and writes for the whole batch go to Redis in one
+        round trip each; only uncached symbols hit the APIs.
+        
         Args:
             symbols: List of asset symbols
         
         Returns:
             Dictionary mapping symbols to names
         """
-        # Fetch all names concurrently
-        tasks = [self.get_asset_name(symbol) for symbol in symbols]
-        names = await asyncio.gather(*tasks)
+        names: Dict[str, str] = {}
+        pending = []
+        for symbol in dict.fromkeys(symbols):
+            name = self._l1.get(symbol)
+            if name:
+                names[symbol] = name
+            else:
+                pending.append(symbol)
+        
+        if pending:
+            cached = self.db.mget([self._get_cache_key(symbol) for symbol in pending])
+            missing = []
+            for symbol, name in zip(pending, cached):
+                if name:
+                    names[symbol] = name
+                    self._l1.set(symbol, name)
+                else:
+                    missing.append(symbol)
+            
+            if missing:
+                # Fetch uncached names concurrently, bounded so large batches don't flood the pool
+                new_names: Dict[str, str] = {}
+                sem = asyncio.Semaphore(self.MAX_CONCURRENCY)
+                
+                async def _one(symbol: str):
+                    async with sem:
+                        new_names[symbol] = await self._resolve_name(symbol)
+                
+                async with asyncio.TaskGroup() as tg:
+                    for symbol in missing:
+                        tg.create_task(_one(symbol))
+                
+                for symbol, name in new_names.items():
+                    self._l1.set(symbol, name)
+                self.db.mset(
+                    {self._get_cache_key(symbol): name for symbol, name in new_names.items()},
+                    expiry=self.CACHE_TTL
+                )
+                names.update(new_names)
         
         # Build result dictionary
-        return {symbol: name for symbol, name in zip(symbols, names)}
+        return {symbol: names[symbol] for symbol in symbols}
@@ -2,10 +2,14 @@
 韩国股票数据获取器 V2（pykrx 主导版）
 """
 import asyncio
+import contextvars
+import json
 import redis
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from loguru import logger
+from openclaw.utils.helpers import TTLCache
 
 try:
     from pykrx import stock as pykrx_stock
@@ -23,23 +27,59 @@ except ImportError:
     YFINANCE_AVAILABLE = False
 
 
+# 批量获取期间暂存的 Redis 写入（key -> (ttl, value)），结束时一次 pipeline 提交
+_write_batch: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    'kr_stock_write_batch', default=None
+)
+
+# 本地股票名称映射（模块级只读，所有实例共享）
+STOCK_NAMES_KR = MappingProxyType({
+    '005930': '삼성전자',
+    '000660': 'SK하이닉스',
+    '035420': 'NAVER',
+    '035720': '카카오',
+    '051910': 'LG화학',
+    '006400': '삼성SDI',
+    '207940': '삼성바이오로직스',
+    '068270': '셀트리온',
+    '005380': '현대차',
+    '000270': '기아',
+    '005490': 'POSCO홀딩스',
+    '012330': '현대모비스',
+    '028260': '삼성물산',
+    '105560': 'KB금융',
+    '055550': '신한지주',
+    '086790': '하나금융지주',
+    '066570': 'LG전자',
+    '003550': 'LG',
+    '373220': 'LG에너지솔루션',
+    '017670': 'SK텔레콤',
+    '034730': 'SK',
+    '096770': 'SK이노베이션',
+    '015760': '한국전력',
+    '032830': '삼성생명',
+    '018260': '삼성에스디에스',
+    '009150': '삼성전기',
+    '033780': 'KT&G',
+    '323410': '카카오뱅크',
+    '010950': 'S-Oil',
+    '011200': 'HMM',
+})
+
+
 class KoreanStockFetcherV2:
     """韩国股票数据获取器 V2"""
     
+    MAX_CONCURRENCY = 32  # 批量获取的最大并发数
+    STOCK_NAMES_KR = STOCK_NAMES_KR
+    
     def __init__(self, redis_client: Optional[redis.Redis] = None):
         self.redis = redis_client
         self.price_cache_ttl = timedelta(seconds=30)
         self.name_cache_ttl = timedelta(days=1)
+        self._name_l1 = TTLCache(maxsize=4096, ttl=3600)  # In front of Redis
         
-        self.yahoo_queried = set()
-        
-        self.stock_names_kr = {
-            '005930': '삼성전자',
-            '000660': 'SK하이닉스',
-            '035420': 'NAVER',
-            '035720': '카카오',
-            '051910': 'LG화학',
-        }
+        self.yahoo_queried: Set[str] = set()  # 已查询过 Yahoo 的代码（O(1) 查重）
         
         self.stats = {
             'pykrx_calls': 0,
@@ -55,8 +95,13 @@ class KoreanStockFetcherV2:
         """获取股票名称"""
         base_code = symbol.replace('.KS', '').replace('.KQ', '').upper()
         
-        # 1. 缓存
-        cached = self._get_name_from_cache(base_code)
+        # 1. 缓存（进程内 L1 -> Redis）
+        cached = self._name_l1.get(base_code)
+        if cached is None:
+            cached = self._get_name_from_cache(base_code)
+            if cached:
+                # 只在 Redis 命中时写入 L1，L1 命中不续期（过期后会重新读 Redis）
+                self._name_l1.set(base_code, cached)
         if cached:
             self.stats['cache_hits'] += 1
             return cached
@@ -74,8 +119,8 @@ class KoreanStockFetcherV2:
             pass
         
         # 3. 本地映射
-        if base_code in self.stock_names_kr:
-            name = self.stock_names_kr[base_code]
+        name = self.STOCK_NAMES_KR.get(base_code)
+        if name:
             self.stats['local_fallback'] += 1
             self._save_name_to_cache(base_code, name)
             return name
@@ -137,19 +182,30 @@ class KoreanStockFetcherV2:
         return None
     
     async def get_multiple_stocks(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
-        """批量获取"""
-        tasks = []
-        for symbol in symbols:
-            tasks.append(self._get_stock_full_data(symbol))
+        """批量获取（限制并发，单个失败不影响其他）"""
+        sem = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        results: Dict[str, Dict[str, Any]] = {}
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def _one(symbol: str):
+            async with sem:
+                try:
+                    results[symbol] = await self._get_stock_full_data(symbol)
+                except Exception as e:
+                    logger.warning(f"获取 {symbol} 失败: {e}")
         
-        stock_data = {}
-        for symbol, result in zip(symbols, results):
-            if isinstance(result, dict):
-                stock_data[symbol] = result
+        # 子任务继承 context，缓存写入累积到同一批次
+        batch: Dict[str, Any] = {}
+        token = _write_batch.set(batch)
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for symbol in symbols:
+                    tg.create_task(_one(symbol))
+        finally:
+            _write_batch.reset(token)
+            self._flush_writes(batch)
         
-        return stock_data
+        # 保持输入顺序
+        return {symbol: results[symbol] for symbol in symbols if symbol in results}
     
     async def _get_stock_full_data(self, symbol: str) -> Dict[str, Any]:
         """获取完整数据"""
@@ -172,12 +228,34 @@ class KoreanStockFetcherV2:
         except:
             return None
     
+    def _cache_write(self, key: str, ttl: timedelta, value: str):
+        """写入 Redis；批量获取期间先暂存，由 _flush_writes 统一提交"""
+        if not self.redis:
+            return
+        batch = _write_batch.get()
+        if batch is not None:
+            batch[key] = (ttl, value)
+            return
+        try:
+            self.redis.setex(key, ttl, value)
+        except:
+            pass
+    
+    def _flush_writes(self, batch: Dict[str, Any]):
+        """一次往返提交暂存的写入"""
+        if not batch or not self.redis:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for key, (ttl, value) in batch.items():
+                pipe.setex(key, ttl, value)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"批量写入缓存失败: {e}")
+    
     def _save_name_to_cache(self, code: str, name: str):
-        if self.redis:
-            try:
-                self.redis.setex(f"kr_stock_name_v2:{code}", self.name_cache_ttl, name)
-            except:
-                pass
+        self._name_l1.set(code, name)
+        self._cache_write(f"kr_stock_name_v2:{code}", self.name_cache_ttl, name)
     
     def _get_price_from_cache(self, code: str) -> Optional[Dict[str, Any]]:
         if not self.redis:
@@ -191,16 +269,7 @@ class KoreanStockFetcherV2:
             return None
     
     def _save_price_to_cache(self, code: str, price_data: Dict[str, Any]):
-        if self.redis:
-            try:
-                import json
-                self.redis.setex(
-                    f"kr_stock_price_v2:{code}",
-                    self.price_cache_ttl,
-                    json.dumps(price_data)
-                )
-            except:
-                pass
+        self._cache_write(f"kr_stock_price_v2:{code}", self.price_cache_ttl, json.dumps(price_data))
     
     def get_stats(self) -> Dict[str, Any]:
         """获取统计"""
@@ -34,6 +34,69 @@ from openclaw.skills.execution.position_tracker import PositionTracker
 from openclaw.core.portfolio_manager import PortfolioManager
 
 
+# ==========================================
+# 消息模板（模块级预编译，format_map 渲染）
+# ==========================================
+
+_PORTFOLIO_TMPL = """
+💼 投资组合总览
+
+💰 资金状况:
+  现金余额: ₩{total[cash]:,.0f}
+  持仓市值: ₩{total[position_value]:,.0f}
+  组合总值: ₩{total[portfolio_value]:,.0f}
+
+📈 收益情况:
+  总盈亏: ₩{total[total_pnl]:,.0f}
+  收益率: {total[total_pnl_pct]:+.2f}%
+
+📊 持仓分布:
+  🇰🇷 韩国股票: {stocks[count]} 只
+     市值: ₩{stocks[total_value]:,.0f}
+     盈亏: ₩{stocks[unrealized_pnl]:,.0f} ({stocks[unrealized_pnl_pct]:+.2f}%)
+  
+  🪙 加密货币: {crypto[count]} 个
+     市值: ₩{crypto[total_value]:,.0f}
+     盈亏: ₩{crypto[unrealized_pnl]:,.0f} ({crypto[unrealized_pnl_pct]:+.2f}%)
+
+⏰ 更新: {time}
+"""
+
+_POSITIONS_HEADER_TMPL = "{title}:\n━━━━━━━━━━━━━━━━\n"
+
+_POSITION_ROW_TMPL = (
+    "\n{emoji} {display_name}\n"
+    "  数量: {quantity}\n"
+    "  成本: ₩{avg_entry_price:,.0f}\n"
+    "  现价: ₩{current_price:,.0f}\n"
+    "  市值: ₩{current_value:,.0f}\n"
+    "  盈亏: ₩{pnl:,.0f} ({pnl_pct:+.2f}%)\n"
+)
+
+_DAILY_REPORT_TMPL = """
+📅 OpenClaw 每日报告
+{date}
+
+💼 组合总览:
+  组合总值: ₩{total[portfolio_value]:,.0f}
+  总盈亏: ₩{total[total_pnl]:,.0f} ({total[total_pnl_pct]:+.2f}%)
+
+🇰🇷 韩国股票 ({stocks[count]} 只):
+{stock_list}
+  市值: ₩{stocks[total_value]:,.0f}
+  盈亏: ₩{stocks[unrealized_pnl]:,.0f} ({stocks[unrealized_pnl_pct]:+.2f}%)
+
+🪙 加密货币 ({crypto[count]} 个):
+{crypto_list}
+  市值: ₩{crypto[total_value]:,.0f}
+  盈亏: ₩{crypto[unrealized_pnl]:,.0f} ({crypto[unrealized_pnl_pct]:+.2f}%)
+
+💰 现金余额: ₩{total[cash]:,.0f}
+
+✅ 系统运行正常
+"""
+
+
 class OpenClawTelegramBot:
     """OpenClaw Telegram Bot (增强版)"""
     
@@ -100,7 +163,7 @@ class OpenClawTelegramBot:
             return self.stock_names_map[symbol]
         
         # 3. 如果是加密货币，直接返回
-        if symbol.startswith('KRW-') or symbol.startswith('USDT-'):
+        if symbol.startswith(('KRW-', 'USDT-')):
             name = symbol.replace('KRW-', '').replace('USDT-', '')
             self.stock_names_cache[symbol] = name
             return name
@@ -213,7 +276,7 @@ class OpenClawTelegramBot:
   • 交易时段: {'是 🟢' if self._is_trading_time() else '否 🔴'}
   • 股票名称缓存: {len(self.stock_names_cache)} 个
         """
-        await update.message.reply_text(status_message)
+        await self._send_quiet(update, status_message)
     
     async def cmd_portfolio(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """处理 /portfolio 命令"""
@@ -228,35 +291,14 @@ class OpenClawTelegramBot:
             # 获取组合数据
             portfolio = self.pm.get_portfolio_by_type(current_prices)
             
-            total = portfolio['total']
-            stocks = portfolio['stocks']
-            crypto = portfolio['crypto']
+            message = _PORTFOLIO_TMPL.format_map({
+                'total': portfolio['total'],
+                'stocks': portfolio['stocks'],
+                'crypto': portfolio['crypto'],
+                'time': datetime.now().strftime('%H:%M:%S'),
+            })
             
-            message = f"""
-💼 投资组合总览
-
-💰 资金状况:
-  现金余额: ₩{total['cash']:,.0f}
-  持仓市值: ₩{total['position_value']:,.0f}
-  组合总值: ₩{total['portfolio_value']:,.0f}
-
-📈 收益情况:
-  总盈亏: ₩{total['total_pnl']:,.0f}
-  收益率: {total['total_pnl_pct']:+.2f}%
-
-📊 持仓分布:
-  🇰🇷 韩国股票: {stocks['count']} 只
-     市值: ₩{stocks['total_value']:,.0f}
-     盈亏: ₩{stocks['unrealized_pnl']:,.0f} ({stocks['unrealized_pnl_pct']:+.2f}%)
-  
-  🪙 加密货币: {crypto['count']} 个
-     市值: ₩{crypto['total_value']:,.0f}
-     盈亏: ₩{crypto['unrealized_pnl']:,.0f} ({crypto['unrealized_pnl_pct']:+.2f}%)
-
-⏰ 更新: {datetime.now().strftime('%H:%M:%S')}
-            """
-            
-            await update.message.reply_text(message)
+            await self._send_quiet(update, message)
             
         except Exception as e:
             logger.error(f"Portfolio 查询失败: {e}")
@@ -283,52 +325,22 @@ class OpenClawTelegramBot:
             # 股票
             stock_positions = self.pm.get_stock_positions()
             if stock_positions:
-                message += "🇰🇷 韩国股票:\n"
-                message += "━━━━━━━━━━━━━━━━\n"
-                
+                message += _POSITIONS_HEADER_TMPL.format(title="🇰🇷 韩国股票")
                 for symbol, pos in stock_positions.items():
-                    # 获取股票名称
                     name = await self.get_stock_name(symbol)
-                    display_name = self.format_stock_display(symbol, name)
-                    
-                    current_price = current_prices.get(symbol, pos['avg_entry_price'])
-                    current_value = pos['quantity'] * current_price
-                    pnl = current_value - pos['total_cost']
-                    pnl_pct = (pnl / pos['total_cost']) * 100
-                    
-                    emoji = "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪"
-                    
-                    message += f"\n{emoji} {display_name}\n"
-                    message += f"  数量: {pos['quantity']:.0f}주\n"
-                    message += f"  成本: ₩{pos['avg_entry_price']:,.0f}\n"
-                    message += f"  现价: ₩{current_price:,.0f}\n"
-                    message += f"  市值: ₩{current_value:,.0f}\n"
-                    message += f"  盈亏: ₩{pnl:,.0f} ({pnl_pct:+.2f}%)\n"
+                    message += self._render_position_row(
+                        symbol, name, pos, current_prices, f"{pos['quantity']:.0f}주"
+                    )
             
             # 加密货币
             crypto_positions = self.pm.get_crypto_positions()
             if crypto_positions:
-                message += "\n🪙 加密货币:\n"
-                message += "━━━━━━━━━━━━━━━━\n"
-                
+                message += "\n" + _POSITIONS_HEADER_TMPL.format(title="🪙 加密货币")
                 for symbol, pos in crypto_positions.items():
-                    # 获取名称
                     name = await self.get_stock_name(symbol)
-                    display_name = self.format_stock_display(symbol, name)
-                    
-                    current_price = current_prices.get(symbol, pos['avg_entry_price'])
-                    current_value = pos['quantity'] * current_price
-                    pnl = current_value - pos['total_cost']
-                    pnl_pct = (pnl / pos['total_cost']) * 100
-                    
-                    emoji = "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪"
-                    
-                    message += f"\n{emoji} {display_name}\n"
-                    message += f"  数量: {pos['quantity']:.4f}\n"
-                    message += f"  成本: ₩{pos['avg_entry_price']:,.0f}\n"
-                    message += f"  现价: ₩{current_price:,.0f}\n"
-                    message += f"  市值: ₩{current_value:,.0f}\n"
-                    message += f"  盈亏: ₩{pnl:,.0f} ({pnl_pct:+.2f}%)\n"
+                    message += self._render_position_row(
+                        symbol, name, pos, current_prices, f"{pos['quantity']:.4f}"
+                    )
             
             message += f"\n⏰ 更新: {datetime.now().strftime('%H:%M:%S')}"
             
@@ -480,7 +492,7 @@ class OpenClawTelegramBot:
 ⏰ 更新: {datetime.now().strftime('%H:%M:%S')}
             """
             
-            await update.message.reply_text(message)
+            await self._send_quiet(update, message)
             
         except Exception as e:
             logger.error(f"Performance 查询失败: {e}")
@@ -539,45 +551,33 @@ class OpenClawTelegramBot:
             current_prices = await self._get_current_prices()
             portfolio = self.pm.get_portfolio_by_type(current_prices)
             
-            total = portfolio['total']
             stocks = portfolio['stocks']
             crypto = portfolio['crypto']
             
-            # 构建持仓列表
-            stock_list = ""
-            if stocks['count'] > 0:
-                for symbol in self.pm.get_stock_positions().keys():
-                    name = await self.get_stock_name(symbol)
-                    stock_list += f"  • {name} ({symbol})\n"
-            
-            crypto_list = ""
-            if crypto['count'] > 0:
-                for symbol in self.pm.get_crypto_positions().keys():
-                    name = await self.get_stock_name(symbol)
-                    crypto_list += f"  • {name}\n"
+            # 构建持仓列表（去重后并发获取名称）
+            stock_positions = self.pm.get_stock_positions()
+            crypto_positions = self.pm.get_crypto_positions()
+            all_symbols = list({*stock_positions, *crypto_positions})
+            names = dict(zip(
+                all_symbols,
+                await asyncio.gather(*(self.get_stock_name(s) for s in all_symbols))
+            ))
+            
+            stock_list = "".join(
+                f"  • {names[symbol]} ({symbol})\n" for symbol in stock_positions
+            )
+            crypto_list = "".join(
+                f"  • {names[symbol]}\n" for symbol in crypto_positions
+            )
             
-            message = f"""
-📅 OpenClaw 每日报告
-{datetime.now().strftime('%Y-%m-%d')}
-
-💼 组合总览:
-  组合总值: ₩{total['portfolio_value']:,.0f}
-  总盈亏: ₩{total['total_pnl']:,.0f} ({total['total_pnl_pct']:+.2f}%)
-
-🇰🇷 韩国股票 ({stocks['count']} 只):
-{stock_list if stock_list else "  无持仓\n"}
-  市值: ₩{stocks['total_value']:,.0f}
-  盈亏: ₩{stocks['unrealized_pnl']:,.0f} ({stocks['unrealized_pnl_pct']:+.2f}%)
-
-🪙 加密货币 ({crypto['count']} 个):
-{crypto_list if crypto_list else "  无持仓\n"}
-  市值: ₩{crypto['total_value']:,.0f}
-  盈亏: ₩{crypto['unrealized_pnl']:,.0f} ({crypto['unrealized_pnl_pct']:+.2f}%)
-
-💰 现金余额: ₩{total['cash']:,.0f}
-
-✅ 系统运行正常
-            """
+            message = _DAILY_REPORT_TMPL.format_map({
+                'date': datetime.now().strftime('%Y-%m-%d'),
+                'total': portfolio['total'],
+                'stocks': stocks,
+                'crypto': crypto,
+                'stock_list': stock_list or "  无持仓\n",
+                'crypto_list': crypto_list or "  无持仓\n",
+            })
             
             await self.bot.send_message(
                 chat_id=self.chat_id,
@@ -593,6 +593,39 @@ class OpenClawTelegramBot:
     # 辅助方法
     # ==========================================
     
+    def _render_position_row(
+        self,
+        symbol: str,
+        name: str,
+        pos: Dict[str, Any],
+        current_prices: Dict[str, float],
+        quantity: str
+    ) -> str:
+        """渲染单条持仓明细"""
+        current_price = current_prices.get(symbol, pos['avg_entry_price'])
+        current_value = pos['quantity'] * current_price
+        pnl = current_value - pos['total_cost']
+        
+        return _POSITION_ROW_TMPL.format_map({
+            'emoji': "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪",
+            'display_name': self.format_stock_display(symbol, name),
+            'quantity': quantity,
+            'avg_entry_price': pos['avg_entry_price'],
+            'current_price': current_price,
+            'current_value': current_value,
+            'pnl': pnl,
+            'pnl_pct': (pnl / pos['total_cost']) * 100,
+        })
+    
+    async def _send_quiet(self, update: Update, text: str):
+        """静默发送查询结果（不引用原消息，不触发通知）"""
+        await self.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text=text,
+            disable_notification=True,
+            parse_mode=None
+        )
+    
     def _is_trading_time(self) -> bool:
         """检查是否在交易时间"""
         now = datetime.now()
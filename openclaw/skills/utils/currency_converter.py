@@ -3,13 +3,28 @@ Currency Converter for OpenClaw Trading System
 Converts all prices to Korean Won (KRW) with real-time exchange rates
 """
 import asyncio
+import copy
+import functools
 import re
+import time
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import numpy as np
 import yaml
 import os
 from loguru import logger
 
+try:
+    from yaml import CSafeLoader as _YamlLoader  # libyaml C loader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 try:
     import aiohttp
     AIOHTTP_AVAILABLE = True
@@ -18,6 +33,148 @@ except ImportError:
     logger.warning("aiohttp not available, exchange rates will use fallback only")
 
 
+# Context fields holding prices that convert_context_to_krw converts
+_PRICE_FIELDS = frozenset({
+    'current_price', 'price', 'open', 'high', 'low', 'close',
+    'ma5', 'ma15', 'ma20', 'ma50', 'ma200',
+    'support', 'resistance',
+    'stop_loss', 'take_profit', 'take_profit_1', 'take_profit_2',
+    'entry_price', 'exit_price'
+})
+
+
+@functools.lru_cache(maxsize=16)
+def _load_config(path: str) -> Dict:
+    """Read and parse a currency config file (cached by resolved path)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+# A quantified group that itself contains a quantifier, e.g. "(a+)+"
+_NESTED_QUANTIFIER_RX = re.compile(r"\([^()]*[+*][^()]*\)[+*{]")
+
+
+def _normalize_pattern(pattern: str) -> Optional[str]:
+    """
+    Anchor and validate a configured asset pattern
+    
+    Args:
+        pattern: Regex from asset_currency_mapping.patterns
+    
+    Returns:
+        Pattern anchored with \\A, or None if it is invalid or prone to
+        catastrophic backtracking
+    """
+    if _NESTED_QUANTIFIER_RX.search(pattern):
+        logger.warning(f"Ignoring asset pattern with nested quantifiers: {pattern}")
+        return None
+    
+    if not pattern.startswith(('^', '\\A')):
+        pattern = '\\A' + pattern
+    
+    try:
+        re.compile(pattern, re.ASCII)
+    except re.error as e:
+        logger.warning(f"Ignoring invalid asset pattern {pattern}: {e}")
+        return None
+    
+    return pattern
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_patterns(
+    patterns_key: Tuple[Tuple[str, str], ...]
+) -> Tuple["re.Pattern", Dict[str, str]]:
+    """
+    Fuse asset patterns into one ordered named-group alternation
+    
+    Alternation is tried left to right, so config order still decides.
+    """
+    # Symbols are ASCII, so skip Unicode category tables while matching
+    union_rx = re.compile("|".join(
+        f"(?P<g{i}>{pattern})" for i, (pattern, _) in enumerate(patterns_key)
+    ), re.ASCII)
+    group_currency = {f"g{i}": currency for i, (_, currency) in enumerate(patterns_key)}
+    return union_rx, group_currency
+
+
+# Literal text made of symbol characters and escaped punctuation (e.g. "\\.KS")
+_LITERAL_RX = re.compile(r"(?:[A-Za-z0-9_\-]|\\[^A-Za-z0-9])+")
+_SUFFIX_RULE_RX = re.compile(r"(?:\\A|\^)\.\*(?P<lit>.+)\$")
+_PREFIX_RULE_RX = re.compile(r"(?:\\A|\^)(?P<lit>.+?)\.\*\$?")
+
+
+def _literal_rule(pattern: str) -> Optional[Tuple[str, str]]:
+    """
+    Recognize simple suffix/prefix patterns such as ".*\\.KS$" or "^KRW-.*"
+    
+    Returns:
+        ('suffix' | 'prefix', literal text), or None for general patterns
+    """
+    for kind, rule_rx in (('suffix', _SUFFIX_RULE_RX), ('prefix', _PREFIX_RULE_RX)):
+        m = rule_rx.fullmatch(pattern)
+        if m and _LITERAL_RX.fullmatch(m.group('lit')):
+            return kind, re.sub(r"\\(.)", r"\1", m.group('lit'))
+    return None
+
+
+@functools.lru_cache(maxsize=16)
+def _compile_fast_rules(patterns_key: Tuple[Tuple[str, str], ...]) -> Tuple[list, list]:
+    """
+    Split the pattern set into str-method literal rules and regex rules
+    
+    Returns:
+        (literal_rules, regex_rules): [(index, kind, literal, currency)] and
+        [(index, compiled pattern)], both in config order
+    """
+    literal_rules = []
+    regex_rules = []
+    for i, (pattern, currency) in enumerate(patterns_key):
+        rule = _literal_rule(pattern)
+        if rule:
+            literal_rules.append((i, rule[0], rule[1], currency))
+        else:
+            regex_rules.append((i, re.compile(pattern, re.ASCII)))
+    return literal_rules, regex_rules
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_currency(
+    symbol: str,
+    patterns_key: Tuple[Tuple[str, str], ...],
+    default_currency: str
+) -> str:
+    """Detect a symbol's currency (memoized per pattern set)"""
+    # Fast path: the first matching suffix/prefix rule wins, provided no
+    # earlier general pattern matches (config order must still decide)
+    literal_rules, regex_rules = _compile_fast_rules(patterns_key)
+    for i, kind, literal, currency in literal_rules:
+        hit = symbol.endswith(literal) if kind == 'suffix' else symbol.startswith(literal)
+        if hit:
+            if not any(j < i and rx.match(symbol) for j, rx in regex_rules):
+                logger.debug("Asset {} -> {} ({} rule: {})", symbol, currency, kind, literal)
+                return currency
+            break
+    
+    union_rx, group_currency = _compile_patterns(patterns_key)
+    m = union_rx.match(symbol)
+    if m:
+        currency = group_currency[m.lastgroup]
+        logger.debug("Asset {} -> {} (matched: {})", symbol, currency, m.lastgroup)
+        return currency
+    
+    logger.debug("Asset {} -> {} (default)", symbol, default_currency)
+    return default_currency
+
+
+@functools.lru_cache(maxsize=8192)
+def _fmt_pct(pct: float, decimal_places: int, show_positive_sign: bool) -> str:
+    """Format an already-rounded percentage value"""
+    if pct >= 0 and show_positive_sign:
+        return f"+{pct:.{decimal_places}f}%"
+    return f"{pct:.{decimal_places}f}%"
+
+
 class CurrencyConverter:
     """
     Currency converter with real-time exchange rates
@@ -43,12 +200,19 @@ class CurrencyConverter:
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
             config_path = os.path.join(base_dir, "config", "currency_config.yaml")
         
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        # Parsed once per path; each instance gets its own mutable copy
+        self.config = copy.deepcopy(_load_config(os.path.abspath(config_path)))
         
         # Exchange rates cache
         self.exchange_rates: Dict[str, float] = {}
-        self.last_update: Optional[datetime] = None
+        
+        # Shared HTTP session (created lazily, reused across refreshes). The
+        # session, lock and semaphore belong to one event loop; _bind_loop
+        # replaces them when the converter is used from another loop.
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_sem = asyncio.Semaphore(4)
         
         # Configuration shortcuts
         self.primary_currency = self.config.get('primary_currency', 'KRW')
@@ -57,13 +221,54 @@ class CurrencyConverter:
         self.cache_duration = timedelta(
             hours=self.config['exchange_rate']['cache_duration_hours']
         )
+        self._cache_seconds = self.cache_duration.total_seconds()
+        self._cache_deadline = 0.0  # time.monotonic() until which rates are fresh
+        
+        # Bound connect and socket reads separately so a stalled API fails fast
+        timeout_seconds = self.config['exchange_rate']['timeout_seconds']
+        self._http_timeout = (
+            aiohttp.ClientTimeout(
+                total=timeout_seconds,
+                connect=3,
+                sock_read=timeout_seconds
+            )
+            if AIOHTTP_AVAILABLE else None
+        )
+        
+        # Pre-bound "₩{:,}".format, memoized per rounded amount
+        self._krw_fmt = functools.lru_cache(maxsize=8192)(
+            (self.currency_symbol + "{:,}").format
+        )
+        
+        pct_format = self.config['formatting']['percentage']
+        self._pct_decimals = pct_format['decimal_places']
+        self._pct_show_plus = pct_format['show_positive_sign']
         
         # Asset patterns for currency detection
         self.asset_patterns = self.config['asset_currency_mapping']['patterns']
         self.default_currency = self.config['asset_currency_mapping']['default']
         
+        # Hashable pattern set; changing the config yields a new cache key
+        self._patterns_key = tuple(
+            (pattern, p['currency'])
+            for p in self.asset_patterns
+            if (pattern := _normalize_pattern(p['pattern'])) is not None
+        )
+        
         logger.info(f"💱 Currency converter initialized (target: {self.primary_currency})")
     
+    @property
+    def last_update(self) -> Optional[datetime]:
+        """Wall-clock time of the last rate refresh (None if never refreshed)"""
+        if not self._cache_deadline:
+            return None
+        age = time.monotonic() - (self._cache_deadline - self._cache_seconds)
+        return datetime.now() - timedelta(seconds=age)
+    
+    def _mark_refreshed(self):
+        """Start a new cache period from now"""
+        self._cache_deadline = time.monotonic() + self._cache_seconds
+    
     async def update_rates(self, force: bool = False) -> bool:
         """
         Update exchange rates from API
@@ -74,91 +279,155 @@ class CurrencyConverter:
         Returns:
             True if rates updated successfully, False if using fallback
         """
-        # Check if cache is still valid
-        if not force and self.last_update:
-            if datetime.now() - self.last_update < self.cache_duration:
+        await self._bind_loop()
+        
+        # Single-flight: concurrent callers wait here and then hit the warm cache
+        async with self._refresh_lock:
+            # Check if cache is still valid
+            if not force and time.monotonic() < self._cache_deadline:
                 logger.debug("Using cached exchange rates")
                 return True
+            
+            if not AIOHTTP_AVAILABLE:
+                logger.warning("aiohttp not available, using fallback rates")
+                self.exchange_rates = self.fallback_rates.copy()
+                self._mark_refreshed()
+                return False
+            
+            # Race primary and backup APIs, keep whichever succeeds first
+            success = await self._fetch_first_available()
+            
+            # Use fallback rates if all APIs fail
+            if not success:
+                logger.warning("All APIs failed, using fallback rates")
+                self.exchange_rates = self.fallback_rates.copy()
+                self._mark_refreshed()
+                return False
+            
+            self._mark_refreshed()
+            logger.info(f"✅ Exchange rates updated: {len(self.exchange_rates)} currencies")
+            return True
+    
+    async def _fetch_first_available(self) -> bool:
+        """
+        Query primary and backup APIs concurrently
         
-        if not AIOHTTP_AVAILABLE:
-            logger.warning("aiohttp not available, using fallback rates")
-            self.exchange_rates = self.fallback_rates.copy()
-            self.last_update = datetime.now()
+        Returns:
+            True as soon as either API succeeds, False if both fail
+        """
+        pending = {
+            asyncio.create_task(self._fetch_from_primary_api()),
+            asyncio.create_task(self._fetch_from_backup_api()),
+        }
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                if any(task.result() for task in done):
+                    return True
             return False
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _invert_rates(self, rates: Dict[str, float]) -> Dict[str, float]:
+        """
+        Turn KRW->X rates into X->KRW rates, merged over the fallback table
         
-        # Try primary API
-        success = await self._fetch_from_primary_api()
-        
-        # Try backup API if primary fails
-        if not success:
-            logger.warning("Primary API failed, trying backup...")
-            success = await self._fetch_from_backup_api()
+        Args:
+            rates: API rates quoted per 1 KRW
         
-        # Use fallback rates if all APIs fail
-        if not success:
-            logger.warning("All APIs failed, using fallback rates")
-            self.exchange_rates = self.fallback_rates.copy()
-            self.last_update = datetime.now()
-            return False
+        Returns:
+            KRW per unit of each currency (fallback fills any gaps)
+        """
+        codes = list(rates)
+        arr = np.asarray(list(rates.values()), dtype=np.float64)
+        inverted = np.divide(1.0, arr, out=np.zeros_like(arr), where=arr != 0)
+        return {**self.fallback_rates, **dict(zip(codes, inverted.tolist()))}
+    
+    async def _bind_loop(self):
+        """
+        Rebuild the loop-bound session, lock and semaphore for the running loop
         
-        self.last_update = datetime.now()
-        logger.info(f"✅ Exchange rates updated: {len(self.exchange_rates)} currencies")
-        return True
+        A converter outliving its event loop (e.g. the get_converter()
+        singleton across two asyncio.run calls) would otherwise keep a
+        session whose connector is tied to the closed loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        
+        self._loop = loop
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_sem = asyncio.Semaphore(4)
+        stale, self._session = self._session, None
+        if stale is not None and not stale.closed:
+            try:
+                await stale.close()
+            except Exception as e:
+                logger.debug(f"Closing stale exchange-rate session failed: {e}")
     
-    async def _fetch_from_primary_api(self) -> bool:
-        """Fetch rates from primary API"""
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=10,
+                limit_per_host=4,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _fetch(self, api_url: str, label: str) -> bool:
+        """
+        Fetch rates from an exchange-rate API
+        
+        Args:
+            api_url: Endpoint returning rates quoted per 1 KRW
+            label: API name used in log messages
+        
+        Returns:
+            True if rates were fetched and stored
+        """
         try:
-            api_url = self.config['exchange_rate']['primary_api']
-            timeout = self.config['exchange_rate']['timeout_seconds']
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url, timeout=timeout) as response:
+            session = await self._get_session()
+            async with self._refresh_sem:
+                async with session.get(api_url, timeout=self._http_timeout) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        if ORJSON_AVAILABLE:
+                            data = orjson.loads(await response.read())
+                        else:
+                            data = await response.json()
                         
                         # API returns rates FROM KRW to other currencies
                         # We need rates TO KRW (inverse)
                         rates = data.get('rates', {})
                         
                         # Invert rates: if 1 KRW = 0.00075 USD, then 1 USD = 1333.33 KRW
-                        self.exchange_rates = {
-                            currency: 1.0 / rate if rate != 0 else 0
-                            for currency, rate in rates.items()
-                        }
+                        self.exchange_rates = self._invert_rates(rates)
                         
-                        logger.debug(f"Fetched rates from primary API: {len(self.exchange_rates)} currencies")
+                        logger.debug("Fetched rates from {} API: {} currencies", label, len(self.exchange_rates))
                         return True
         
         except Exception as e:
-            logger.warning(f"Primary API fetch failed: {e}")
+            logger.warning(f"{label.capitalize()} API fetch failed: {e}")
         
         return False
     
+    async def _fetch_from_primary_api(self) -> bool:
+        """Fetch rates from primary API"""
+        return await self._fetch(self.config['exchange_rate']['primary_api'], 'primary')
+    
     async def _fetch_from_backup_api(self) -> bool:
         """Fetch rates from backup API"""
-        try:
-            api_url = self.config['exchange_rate']['backup_api']
-            timeout = self.config['exchange_rate']['timeout_seconds']
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url, timeout=timeout) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        rates = data.get('rates', {})
-                        
-                        # Invert rates
-                        self.exchange_rates = {
-                            currency: 1.0 / rate if rate != 0 else 0
-                            for currency, rate in rates.items()
-                        }
-                        
-                        logger.debug(f"Fetched rates from backup API: {len(self.exchange_rates)} currencies")
-                        return True
-        
-        except Exception as e:
-            logger.warning(f"Backup API fetch failed: {e}")
-        
-        return False
+        return await self._fetch(self.config['exchange_rate']['backup_api'], 'backup')
     
     def get_asset_currency(self, symbol: str) -> str:
         """
@@ -178,25 +447,45 @@ class CurrencyConverter:
             >>> converter.get_asset_currency("BTC-USD")
             'USD'
         """
-        # Try each pattern
-        for pattern_config in self.asset_patterns:
-            pattern = pattern_config['pattern']
-            if re.match(pattern, symbol):
-                currency = pattern_config['currency']
-                logger.debug(f"Asset {symbol} -> {currency} (matched: {pattern})")
-                return currency
+        return _detect_currency(symbol, self._patterns_key, self.default_currency)
+    
+    async def ensure_rates(self):
+        """Load exchange rates if none have been fetched yet"""
+        if not self.exchange_rates:
+            await self.update_rates()
+    
+    def _get_rate(self, currency: str) -> float:
+        """
+        Look up the KRW rate for a currency (no I/O)
+        
+        Args:
+            currency: Source currency code (e.g., "USD")
+        
+        Returns:
+            KRW per unit of currency
+        """
+        if currency == 'KRW':
+            return 1.0
+        
+        rate = self.exchange_rates.get(currency)
         
-        # Default currency
-        logger.debug(f"Asset {symbol} -> {self.default_currency} (default)")
-        return self.default_currency
+        if rate is None:
+            logger.warning(
+                f"No exchange rate for {currency}, using fallback"
+            )
+            rate = self.fallback_rates.get(currency, 1.0)
+        
+        return rate
     
-    async def convert_to_krw(
+    def convert_to_krw_sync(
         self,
         amount: float,
         from_currency: str
     ) -> float:
         """
-        Convert amount from any currency to KRW
+        Convert amount to KRW using already-loaded rates
+        
+        Call ``await ensure_rates()`` first; this method never fetches.
         
         Args:
             amount: Amount in original currency
@@ -204,34 +493,43 @@ class CurrencyConverter:
         
         Returns:
             Amount in KRW
-        
-        Examples:
-            >>> await converter.convert_to_krw(100, "USD")
-            133500.0  # 100 USD = 133,500 KRW
         """
         # If already in KRW, return as-is
         if from_currency == 'KRW':
             return amount
         
-        # Ensure rates are loaded
-        if not self.exchange_rates:
-            await self.update_rates()
-        
-        # Get exchange rate
-        rate = self.exchange_rates.get(from_currency)
-        
-        if rate is None:
-            logger.warning(
-                f"No exchange rate for {from_currency}, using fallback"
-            )
-            rate = self.fallback_rates.get(from_currency, 1.0)
+        rate = self._get_rate(from_currency)
         
         # Convert: amount * rate = KRW
         krw_amount = amount * rate
         
-        logger.debug(f"{amount} {from_currency} -> {krw_amount:.2f} KRW (rate: {rate})")
+        # Positional args: loguru only formats the message if a sink accepts DEBUG
+        logger.debug("{} {} -> {:.2f} KRW (rate: {})", amount, from_currency, krw_amount, rate)
         return krw_amount
     
+    async def convert_to_krw(
+        self,
+        amount: float,
+        from_currency: str
+    ) -> float:
+        """
+        Convert amount from any currency to KRW
+        
+        Args:
+            amount: Amount in original currency
+            from_currency: Source currency code (e.g., "USD")
+        
+        Returns:
+            Amount in KRW
+        
+        Examples:
+            >>> await converter.convert_to_krw(100, "USD")
+            133500.0  # 100 USD = 133,500 KRW
+        """
+        if from_currency != 'KRW':
+            await self.ensure_rates()
+        return self.convert_to_krw_sync(amount, from_currency)
+    
     async def convert_price(
         self,
         symbol: str,
@@ -254,7 +552,9 @@ class CurrencyConverter:
             75000.0  # Already in KRW
         """
         currency = self.get_asset_currency(symbol)
-        return await self.convert_to_krw(price, currency)
+        if currency != 'KRW':
+            await self.ensure_rates()
+        return self.convert_to_krw_sync(price, currency)
     
     def format_krw(self, amount: float) -> str:
         """
@@ -272,14 +572,8 @@ class CurrencyConverter:
             >>> converter.format_krw(1234.56)
             '₩1,235'
         """
-        # Round to integer (no decimals for KRW)
-        amount_int = int(round(amount))
-        
-        # Format with thousand separators
-        formatted = f"{amount_int:,}"
-        
-        # Add currency symbol
-        return f"{self.currency_symbol}{formatted}"
+        # Round to integer (no decimals for KRW), then format with symbol
+        return self._krw_fmt(int(round(amount)))
     
     def format_change(self, change_pct: float) -> str:
         """
@@ -297,18 +591,11 @@ class CurrencyConverter:
             >>> converter.format_change(-0.0147)
             '-1.47%'
         """
-        # Get decimal places from config
-        decimal_places = self.config['formatting']['percentage']['decimal_places']
-        show_positive_sign = self.config['formatting']['percentage']['show_positive_sign']
+        # Convert to percentage; rounding first keeps the cache small
+        # (``or 0.0`` folds -0.0 into 0.0, which share a cache key)
+        pct = round(change_pct * 100, self._pct_decimals) or 0.0
         
-        # Convert to percentage
-        pct = change_pct * 100
-        
-        # Format with appropriate sign
-        if pct >= 0 and show_positive_sign:
-            return f"+{pct:.{decimal_places}f}%"
-        else:
-            return f"{pct:.{decimal_places}f}%"
+        return _fmt_pct(pct, self._pct_decimals, self._pct_show_plus)
     
     async def convert_context_to_krw(
         self,
@@ -323,30 +610,37 @@ class CurrencyConverter:
             context: Context dict with price fields
         
         Returns:
-            Context dict with prices in KRW
+            Context dict with prices in KRW (always a new dict; for assets
+            already quoted in KRW the values are returned unchanged)
         """
         # Detect asset currency
         currency = self.get_asset_currency(symbol)
         
-        # Fields to convert
-        price_fields = [
-            'current_price', 'price', 'open', 'high', 'low', 'close',
-            'ma5', 'ma15', 'ma20', 'ma50', 'ma200',
-            'support', 'resistance',
-            'stop_loss', 'take_profit', 'take_profit_1', 'take_profit_2',
-            'entry_price', 'exit_price'
-        ]
+        # Domestic assets need no conversion
+        if currency == self.primary_currency:
+            return context.copy()
         
-        # Convert each price field
+        # Resolve the exchange rate once for all fields
+        if currency != 'KRW':
+            await self.ensure_rates()
+        rate = self._get_rate(currency)
+        
+        # Collect numeric price fields, then convert them in one multiply
         converted = context.copy()
-        for field in price_fields:
-            if field in converted and converted[field] is not None:
+        fields = []
+        values = []
+        for field, value in context.items():
+            if field in _PRICE_FIELDS and value is not None:
                 try:
-                    original = float(converted[field])
-                    converted[field] = await self.convert_to_krw(original, currency)
+                    values.append(float(value))
+                    fields.append(field)
                 except (ValueError, TypeError) as e:
                     logger.warning(f"Failed to convert {field}: {e}")
         
+        if fields:
+            krw_values = np.asarray(values, dtype=np.float64) * rate
+            converted.update(zip(fields, krw_values.tolist()))
+        
         return converted
 
 
@@ -450,5 +744,6 @@ if __name__ == "__main__":
         print()
         
         print("✅ All tests completed!")
+        await converter.close()
     
     asyncio.run(test())
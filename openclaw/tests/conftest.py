@@ -0,0 +1,13 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+from openclaw.core.database import DatabaseManager
+
+
+@pytest.fixture(scope="session")
+def db():
+    """One DatabaseManager (and Redis connection pool) for the whole test session"""
+    manager = DatabaseManager()
+    yield manager
+    manager.close()
@@ -43,6 +43,27 @@ class TestCurrencyConverter:
         # Test KRW to KRW (no conversion)
         krw_amount = await converter.convert_to_krw(75000, "KRW")
         assert krw_amount == 75000.0
+        
+        await converter.close()
+    
+    def test_session_rebuilt_for_new_event_loop(self):
+        """Test a converter reused after asyncio.run gets a fresh session"""
+        from openclaw.skills.utils.currency_converter import CurrencyConverter
+        
+        converter = CurrencyConverter()
+        
+        async def bind():
+            await converter._bind_loop()
+            return await converter._get_session()
+        
+        first = asyncio.run(bind())
+        second = asyncio.run(bind())
+        
+        # The session from the finished loop is closed and replaced
+        assert first is not second
+        assert first.closed
+        
+        asyncio.run(converter.close())
     
     def test_krw_formatting(self):
         """Test KRW amount formatting"""
@@ -200,6 +221,8 @@ class TestAlertManager:
         assert '₩' in alert
         assert 'BUY' in alert
         assert 'AAPL' in alert
+        
+        await manager.close()
     
     def test_percentage_formatting_in_report(self):
         """Test percentage formatting"""
@@ -0,0 +1,185 @@
+"""
+Tests for APIClient retries, GET coalescing and per-host rate limiting
+"""
+import pytest
+import asyncio
+import time
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from openclaw.utils import api_client
+from openclaw.utils.api_client import APIClient, _TokenBucket
+
+
+async def _serve(handler):
+    """Start a local server routing GET /x to ``handler``"""
+    app = web.Application()
+    app.router.add_get('/x', handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+class TestAPIClient:
+    """Test APIClient request handling against a local server"""
+    
+    @pytest.mark.asyncio
+    async def test_retries_transient_status(self):
+        """503 responses are retried until the server succeeds"""
+        calls = []
+        
+        async def handler(request):
+            calls.append(1)
+            if len(calls) < 3:
+                return web.json_response({}, status=503)
+            return web.json_response({"ok": True})
+        
+        server = await _serve(handler)
+        try:
+            async with APIClient(str(server.make_url('')), rate_per_sec=1000, burst=100, backoff_base=0.01) as client:
+                assert await client.get('/x') == {"ok": True}
+            assert len(calls) == 3
+        finally:
+            await server.close()
+            await api_client.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_error(self):
+        """4xx responses other than 429 fail immediately"""
+        calls = []
+        
+        async def handler(request):
+            calls.append(1)
+            return web.json_response({}, status=404)
+        
+        server = await _serve(handler)
+        try:
+            async with APIClient(str(server.make_url('')), rate_per_sec=1000, burst=100, backoff_base=0.01) as client:
+                with pytest.raises(Exception):
+                    await client.get('/x')
+            assert len(calls) == 1
+        finally:
+            await server.close()
+            await api_client.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_identical_gets_are_coalesced(self):
+        """Concurrent identical GETs share one request"""
+        calls = []
+        
+        async def handler(request):
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return web.json_response({"n": len(calls)})
+        
+        server = await _serve(handler)
+        try:
+            async with APIClient(str(server.make_url('')), rate_per_sec=1000, burst=100) as client:
+                results = await asyncio.gather(*(client.get('/x', {"a": 1}) for _ in range(5)))
+            assert results == [{"n": 1}] * 5
+            assert len(calls) == 1
+            assert not client._inflight
+        finally:
+            await server.close()
+            await api_client.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_list_valued_params(self):
+        """List-valued query params are sent and still coalesced"""
+        calls = []
+        
+        async def handler(request):
+            calls.append(request.query.getall('ids'))
+            await asyncio.sleep(0.05)
+            return web.json_response({"ids": request.query.getall('ids')})
+        
+        server = await _serve(handler)
+        try:
+            async with APIClient(str(server.make_url('')), rate_per_sec=1000, burst=100) as client:
+                params = {"ids": ["a", "b"]}
+                results = await asyncio.gather(client.get('/x', params), client.get('/x', params))
+            assert results == [{"ids": ["a", "b"]}] * 2
+            assert calls == [["a", "b"]]
+        finally:
+            await server.close()
+            await api_client.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Cancelling the caller that started a coalesced GET leaves the rest waiting"""
+        async def handler(request):
+            await asyncio.sleep(0.1)
+            return web.json_response({"ok": True})
+        
+        server = await _serve(handler)
+        try:
+            async with APIClient(str(server.make_url('')), rate_per_sec=1000, burst=100) as client:
+                t1 = asyncio.create_task(client.get('/x'))
+                await asyncio.sleep(0.01)
+                t2 = asyncio.create_task(client.get('/x'))
+                await asyncio.sleep(0.01)
+                t1.cancel()
+                
+                assert await t2 == {"ok": True}
+                assert t1.cancelled()
+                assert not t2.cancelled()
+        finally:
+            await server.close()
+            await api_client.shutdown()
+
+
+class TestSharedConnector:
+    """Test the process-wide connection pool"""
+    
+    def test_stale_connector_closed_on_new_loop(self):
+        """A connector from a finished event loop is closed when replaced"""
+        async def enter():
+            async with APIClient("http://127.0.0.1") as client:
+                return client.session.connector
+        
+        first = asyncio.run(enter())
+        second = asyncio.run(enter())
+        
+        assert first is not second
+        assert first.closed
+        assert not second.closed
+        
+        asyncio.run(api_client.shutdown())
+        assert second.closed
+
+
+class TestTokenBucket:
+    """Test the per-host token bucket"""
+    
+    @pytest.mark.asyncio
+    async def test_burst_then_rate(self):
+        """The burst is served at once; further tokens arrive at ``rate``"""
+        bucket = _TokenBucket(rate=50, capacity=5)
+        
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - start < 0.05
+        
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - start >= 0.08  # 5 tokens at 50/s
+    
+    @pytest.mark.asyncio
+    async def test_pause_holds_requests(self):
+        """pause() delays the next token even when the bucket is full"""
+        bucket = _TokenBucket(rate=1000, capacity=10)
+        bucket.pause(0.1)
+        
+        start = time.monotonic()
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+    
+    def test_stricter_client_tightens_shared_bucket(self):
+        """A later client for the same host can lower, but not raise, its limit"""
+        APIClient("https://limits.example")._get_limiter()
+        bucket = APIClient("https://limits.example", rate_per_sec=2, burst=20)._get_limiter()
+        
+        assert (bucket.rate, bucket.capacity) == (2, 10)
+        
+        APIClient("https://limits.example", rate_per_sec=50, burst=50)._get_limiter()
+        assert (bucket.rate, bucket.capacity) == (2, 10)
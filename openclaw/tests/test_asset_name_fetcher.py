@@ -11,10 +11,8 @@ class TestAssetNameFetcher:
     """Test asset name fetching functionality"""
     
     @pytest.mark.asyncio
-    async def test_korean_stock_names(self):
+    async def test_korean_stock_names(self, db):
         """Test fetching Korean stock names from Yahoo Finance"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             # Test individual fetch
             name = await fetcher.get_asset_name('005930.KS')
@@ -27,10 +25,8 @@ class TestAssetNameFetcher:
             print(f"✅ Samsung stock name: {name}")
     
     @pytest.mark.asyncio
-    async def test_multiple_korean_stocks(self):
+    async def test_multiple_korean_stocks(self, db):
         """Test batch fetching of Korean stock names"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             # Test batch fetch
             symbols = ['005930.KS', '035420.KS', '000660.KS']
@@ -45,10 +41,8 @@ class TestAssetNameFetcher:
                 print(f"   {symbol}: {name}")
     
     @pytest.mark.asyncio
-    async def test_crypto_names(self):
+    async def test_crypto_names(self, db):
         """Test fetching cryptocurrency names from CoinGecko"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             # Test Bitcoin
             btc_name = await fetcher.get_asset_name('BTC')
@@ -65,10 +59,8 @@ class TestAssetNameFetcher:
             print(f"✅ Ethereum name: {eth_name}")
     
     @pytest.mark.asyncio
-    async def test_mixed_assets(self):
+    async def test_mixed_assets(self, db):
         """Test fetching mixed stock and crypto names"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             symbols = ['005930.KS', 'KRW-BTC', 'ETH', '035420.KS']
             names = await fetcher.get_multiple_names(symbols)
@@ -81,10 +73,8 @@ class TestAssetNameFetcher:
                 print(f"   {symbol}: {name}")
     
     @pytest.mark.asyncio
-    async def test_caching(self):
+    async def test_caching(self, db):
         """Test Redis caching functionality"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             symbol = '005930.KS'
             
@@ -105,10 +95,8 @@ class TestAssetNameFetcher:
             print(f"✅ Caching works: {name1}")
     
     @pytest.mark.asyncio
-    async def test_fallback_mechanism(self):
+    async def test_fallback_mechanism(self, db):
         """Test fallback to local mappings"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             # Test with invalid symbol that should use fallback
             # First, test that known fallback symbols work
@@ -124,10 +112,8 @@ class TestAssetNameFetcher:
             print(f"✅ Fallback test passed: {fallback_symbol} -> {name}")
     
     @pytest.mark.asyncio
-    async def test_unknown_symbol(self):
+    async def test_unknown_symbol(self, db):
         """Test handling of unknown symbols"""
-        db = DatabaseManager()
-        
         async with AssetNameFetcher(db) as fetcher:
             # Test with completely invalid symbol
             unknown_symbol = 'INVALID999.KS'
@@ -139,9 +125,8 @@ class TestAssetNameFetcher:
             
             print(f"✅ Unknown symbol handled: {unknown_symbol} -> {name}")
     
-    def test_symbol_normalization(self):
+    def test_symbol_normalization(self, db):
         """Test symbol normalization logic"""
-        db = DatabaseManager()
         fetcher = AssetNameFetcher(db)
         
         # Test Upbit format normalization
@@ -152,9 +137,8 @@ class TestAssetNameFetcher:
         
         print("✅ Symbol normalization works correctly")
     
-    def test_asset_type_detection(self):
+    def test_asset_type_detection(self, db):
         """Test asset type detection logic"""
-        db = DatabaseManager()
         fetcher = AssetNameFetcher(db)
         
         # Korean stocks
@@ -193,4 +177,5 @@ if __name__ == '__main__':
             for sym, name in names.items():
                 print(f"  {sym}: {name}")
     
-    asyncio.run(run_test())
+    from openclaw.utils.helpers import run_async
+    run_async(run_test())
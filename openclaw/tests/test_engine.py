@@ -3,9 +3,9 @@ Tests for OpenClaw Trading Engine
 """
 import pytest
 import asyncio
+import numpy as np
 from openclaw.core.engine import OpenClawEngine
 from openclaw.core.scheduler import Scheduler
-from openclaw.core.database import DatabaseManager
 from openclaw.skills.analysis.technical_analysis import TechnicalAnalysis
 from openclaw.skills.analysis.risk_management import RiskManagement
 from openclaw.skills.execution.position_tracker import PositionTracker
@@ -44,10 +44,8 @@ class TestEngine:
 class TestDatabase:
     """Test database operations"""
     
-    def test_database_set_get(self):
+    def test_database_set_get(self, db):
         """Test set and get operations"""
-        db = DatabaseManager()
-        
         # Test set and get
         db.set("test_key", {"value": 123})
         result = db.get("test_key")
@@ -57,13 +55,9 @@ class TestDatabase:
         # Test delete
         db.delete("test_key")
         assert db.get("test_key") is None
-        
-        db.close()
     
-    def test_database_list_operations(self):
+    def test_database_list_operations(self, db):
         """Test list operations"""
-        db = DatabaseManager()
-        
         # Append to list
         db.append_to_list("test_list", "item1")
         db.append_to_list("test_list", "item2")
@@ -74,7 +68,16 @@ class TestDatabase:
         assert "item1" in result
         
         db.delete("test_list")
-        db.close()
+    
+    def test_database_batch_operations(self, db):
+        """Test mset and mget"""
+        db.mset({"test_batch_a": 1, "test_batch_b": {"x": 2}}, expiry=60)
+        result = db.mget(["test_batch_a", "test_missing", "test_batch_b"])
+        
+        assert result == [1, None, {"x": 2}]
+        
+        db.delete("test_batch_a")
+        db.delete("test_batch_b")
 
 
 class TestTechnicalAnalysis:
@@ -148,6 +151,22 @@ class TestRiskManagement:
         
         assert stop_loss == 95.0  # 5% below entry
     
+    def test_stop_loss_vectorized(self):
+        """Test stop loss over an array of entry prices"""
+        config = {
+            "stop_loss": {"enabled": True, "type": "trailing", "percentage": 0.05}
+        }
+        
+        risk_mgr = RiskManagement(config)
+        
+        entries = np.array([100.0, 200.0, 300.0])
+        highs = np.array([110.0, 200.0, 320.0])
+        
+        np.testing.assert_allclose(risk_mgr.calculate_stop_loss(entries), entries * 0.95)
+        np.testing.assert_allclose(
+            risk_mgr.calculate_stop_loss(entries, highest_price=highs), highs * 0.95
+        )
+    
     def test_take_profit_calculation(self):
         """Test take profit calculation"""
         config = {
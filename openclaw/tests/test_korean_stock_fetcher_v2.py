@@ -210,6 +210,16 @@ class TestKoreanStockFetcherV2:
         print(f"   Cache hit rate: {stats['cache_hit_rate']:.1f}%")
         print(f"   Yahoo usage rate: {stats['yahoo_usage_rate']:.1f}%")
     
+    @pytest.mark.asyncio
+    async def test_l1_hit_does_not_extend_ttl(self):
+        """Test an in-process name hit keeps its original expiry"""
+        fetcher = KoreanStockFetcherV2()
+        fetcher._name_l1.set('005930', '삼성전자')
+        expires_at = fetcher._name_l1._data['005930'][0]
+        
+        assert await fetcher.get_stock_name('005930') == '삼성전자'
+        assert fetcher._name_l1._data['005930'][0] == expires_at
+    
     @pytest.mark.asyncio
     async def test_no_yahoo_for_prices(self):
         """Test that Yahoo Finance is NEVER used for price queries"""
@@ -328,4 +338,5 @@ if __name__ == '__main__':
         print("All tests completed!")
         print("=" * 60)
     
-    asyncio.run(run_tests())
+    from openclaw.utils.helpers import run_async
+    run_async(run_tests())
@@ -5,20 +5,34 @@ from .logger import setup_logger
 from .api_client import APIClient
 from .helpers import (
     calculate_percentage_change,
+    calculate_percentage_changes,
     format_currency,
     calculate_volatility,
     is_trading_hours,
     chunk_list,
-    moving_average
+    iter_chunks,
+    moving_average,
+    TTLCache,
+    merge_json_file,
+    run_in_pool,
+    next_poll_delay,
+    run_async
 )
 
 __all__ = [
     'setup_logger',
     'APIClient',
     'calculate_percentage_change',
+    'calculate_percentage_changes',
     'format_currency',
     'calculate_volatility',
     'is_trading_hours',
     'chunk_list',
-    'moving_average'
+    'iter_chunks',
+    'moving_average',
+    'TTLCache',
+    'merge_json_file',
+    'run_in_pool',
+    'next_poll_delay',
+    'run_async'
 ]
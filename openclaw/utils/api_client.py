@@ -1,36 +1,344 @@
 """
 API Client utility for OpenClaw Trading System
 """
+import asyncio
+import gzip
+import random
+import time
 import aiohttp
-from typing import Dict, Any, Optional
+from collections import deque
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
 from loguru import logger
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import aiodns  # noqa: F401  (backs aiohttp.AsyncResolver)
+    AIODNS_AVAILABLE = True
+except ImportError:
+    AIODNS_AVAILABLE = False
+
+try:
+    import brotli  # noqa: F401  (lets aiohttp decode br responses)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    _json_loads = orjson.loads
+else:
+    import json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+# Transient statuses worth retrying, and the cap on a single backoff sleep
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_BACKOFF_SECONDS = 8.0
+
+# Advertise compressed responses; aiohttp decompresses them transparently
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+}
+
+# POST bodies larger than this are gzipped when compress_posts is enabled
+GZIP_MIN_BYTES = 1024
+
+# Read size for streamed response bodies
+STREAM_CHUNK_BYTES = 1 << 16
+
+# Most recent request latencies kept per client for percentile reporting
+LATENCY_SAMPLES = 10000
+
+# Connection pool shared by every APIClient. Keep-alive sockets and TLS
+# sessions are reused across client instances instead of being torn down
+# on each ``async with``. Created lazily because a connector is bound to
+# the event loop that is running when it is built.
+_SHARED_CONNECTOR: Optional[aiohttp.TCPConnector] = None
+_SHARED_CONNECTOR_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_shared_connector() -> aiohttp.TCPConnector:
+    """Get the shared connector for the running event loop"""
+    global _SHARED_CONNECTOR, _SHARED_CONNECTOR_LOOP
+    
+    loop = asyncio.get_running_loop()
+    if (
+        _SHARED_CONNECTOR is None
+        or _SHARED_CONNECTOR.closed
+        or _SHARED_CONNECTOR_LOOP is not loop
+    ):
+        stale, stale_loop = _SHARED_CONNECTOR, _SHARED_CONNECTOR_LOOP
+        _SHARED_CONNECTOR = aiohttp.TCPConnector(
+            limit=1024,
+            limit_per_host=64,
+            # Non-blocking c-ares lookups instead of the getaddrinfo threadpool
+            resolver=aiohttp.AsyncResolver() if AIODNS_AVAILABLE else None,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            keepalive_timeout=75,
+            enable_cleanup_closed=True
+        )
+        _SHARED_CONNECTOR_LOOP = loop
+        if stale is not None and not stale.closed:
+            await _close_connector(stale, stale_loop)
+    return _SHARED_CONNECTOR
+
+
+async def _close_connector(connector: aiohttp.TCPConnector, owner: Optional[asyncio.AbstractEventLoop]):
+    """Close a connector left behind by another event loop"""
+    try:
+        if owner is not None and owner.is_running():
+            # Still alive in another thread: its transports must close there
+            async def _close():
+                await connector.close()
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_close(), owner))
+        else:
+            # Loop already gone: aiohttp only marks the connector closed
+            await connector.close()
+    except Exception as e:
+        logger.debug(f"Closing stale connector failed: {e}")
+
+
+async def shutdown():
+    """Close the shared connection pool (call once at application exit)"""
+    global _SHARED_CONNECTOR, _SHARED_CONNECTOR_LOOP
+    
+    if _SHARED_CONNECTOR is not None and not _SHARED_CONNECTOR.closed:
+        await _SHARED_CONNECTOR.close()
+    _SHARED_CONNECTOR = None
+    _SHARED_CONNECTOR_LOOP = None
+
+
+class _TokenBucket:
+    """Async token bucket: refills ``rate`` tokens/sec up to ``capacity``"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+    
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def pause(self, seconds: float):
+        """Hold all requests for ``seconds`` (e.g. from a Retry-After header)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def drain(self):
+        """Drop any saved-up burst (server reported no quota left)"""
+        self._tokens = 0.0
+    
+    def tighten(self, rate: float, capacity: int):
+        """Lower the rate and/or capacity to the given limits (never raises them)"""
+        self.rate = min(self.rate, rate)
+        self.capacity = min(self.capacity, capacity)
+        self._tokens = min(self._tokens, float(self.capacity))
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return False
+
 
 class APIClient:
     """Generic async API client"""
     
-    def __init__(self, base_url: str = "", headers: Optional[Dict[str, str]] = None):
+    # One token bucket per host, shared by all clients talking to it
+    _LIMITERS: Dict[str, _TokenBucket] = {}
+    
+    def __init__(
+        self,
+        base_url: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        rate_per_sec: float = 10,
+        burst: int = 10,
+        max_retries: int = 4,
+        backoff_base: float = 0.25,
+        concurrency: int = 32,
+        compress_posts: bool = False
+    ):
         """
         Initialize API client
         
         Args:
             base_url: Base URL for API requests
             headers: Default headers for requests
+            rate_per_sec: Sustained request rate allowed per host
+            burst: Maximum requests sent back-to-back per host
+            max_retries: Total attempts for transient failures
+            backoff_base: First retry's maximum backoff in seconds
+            concurrency: Maximum in-flight requests for get_many
+            compress_posts: Gzip large POST bodies (only if the server
+                accepts ``Content-Encoding: gzip`` requests)
         """
         self.base_url = base_url
-        self.headers = headers or {}
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
         self.session: Optional[aiohttp.ClientSession] = None
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.concurrency = concurrency
+        self.compress_posts = compress_posts
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._limiter: Optional[_TokenBucket] = None
+        self.latency_ns: deque = deque(maxlen=LATENCY_SAMPLES)
+    
+    def _get_limiter(self) -> _TokenBucket:
+        """
+        Get the rate limiter for this client's host
+        
+        The bucket is shared per host. A client asking for a stricter rate or
+        burst than the one in force tightens the shared bucket; a looser
+        request is logged and the existing limit kept.
+        """
+        if self._limiter is not None:
+            return self._limiter
+        
+        host = urlparse(self.base_url).netloc or self.base_url
+        limiter = self._LIMITERS.get(host)
+        if limiter is None:
+            limiter = self._LIMITERS[host] = _TokenBucket(self.rate_per_sec, self.burst)
+        elif (self.rate_per_sec, self.burst) != (limiter.rate, limiter.capacity):
+            if self.rate_per_sec < limiter.rate or self.burst < limiter.capacity:
+                limiter.tighten(self.rate_per_sec, self.burst)
+            logger.info(
+                f"Rate limit for {host}: requested {self.rate_per_sec}/s burst {self.burst}, "
+                f"in force {limiter.rate}/s burst {limiter.capacity}"
+            )
+        self._limiter = limiter
+        return limiter
+    
+    def _observe_rate_headers(self, response: aiohttp.ClientResponse):
+        """Slow down when the server signals it is rate limiting us"""
+        limiter = self._get_limiter()
+        
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                limiter.pause(float(retry_after))
+            except ValueError:
+                pass  # HTTP-date form; fall back to the bucket rate
+        
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            limiter.drain()
     
     async def __aenter__(self):
         """Async context manager entry"""
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=await _get_shared_connector(),
+            connector_owner=False,
+            timeout=aiohttp.ClientTimeout(total=10, connect=3),
+            json_serialize=_json_dumps
+        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        # Only the session is closed; the shared connector stays open
         if self.session:
             await self.session.close()
     
+    async def _request(self, method: str, url: str, stream: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        Send a request, retrying transient failures with backoff
+        
+        Retries 429/5xx responses and connection errors with exponential
+        backoff and full jitter; any Retry-After pause is applied by the
+        host's rate limiter before the next attempt.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            stream: Read the body in chunks into one buffer before parsing
+            **kwargs: Passed through to ``session.request``
+        
+        Returns:
+            Response JSON data
+        """
+        started = time.perf_counter_ns()
+        try:
+            return await self._request_with_retries(method, url, stream, **kwargs)
+        finally:
+            self.latency_ns.append(time.perf_counter_ns() - started)
+    
+    async def _request_with_retries(self, method: str, url: str, stream: bool, **kwargs) -> Dict[str, Any]:
+        """Retry loop behind ``_request``"""
+        for attempt in range(self.max_retries):
+            try:
+                async with self._get_limiter():
+                    async with self.session.request(method, url, **kwargs) as response:
+                        self._observe_rate_headers(response)
+                        response.raise_for_status()
+                        if stream:
+                            body = bytearray()
+                            async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+                                body.extend(chunk)
+                            return _json_loads(body)
+                        return await response.json(loads=_json_loads, content_type=None)
+            except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError) as e:
+                retryable = (
+                    not isinstance(e, aiohttp.ClientResponseError)
+                    or e.status in RETRY_STATUSES
+                )
+                if not retryable or attempt == self.max_retries - 1:
+                    raise
+                
+                delay = min(MAX_BACKOFF_SECONDS, self.backoff_base * (2 ** attempt)) * random.random()
+                logger.warning(
+                    f"{method} {url} failed ({e}), retry {attempt + 1}/{self.max_retries - 1} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+    
+    def latency_percentiles(self, pcts: Iterable[float] = (50, 95, 99)) -> Dict[float, float]:
+        """
+        Request latency percentiles over recent requests
+        
+        Latency covers the whole request including rate-limit waits and
+        retries.
+        
+        Args:
+            pcts: Percentiles to report (0-100)
+        
+        Returns:
+            Percentile -> latency in milliseconds (empty if no requests yet)
+        """
+        samples = sorted(self.latency_ns)
+        if not samples:
+            return {}
+        
+        last = len(samples) - 1
+        return {p: samples[min(last, int(round(p / 100 * last)))] / 1e6 for p in pcts}
+    
     async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Make GET request
@@ -47,9 +355,52 @@ class APIClient:
         
         url = f"{self.base_url}{endpoint}"
         try:
-            async with self.session.get(url, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
+            key = ('GET', url, tuple(sorted(
+                (k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items()
+            )))
+            hash(key)
+        except TypeError:
+            key = None  # unorderable or unhashable params; skip request coalescing
+        
+        # Identical GET already in flight: share its response. The request runs
+        # in its own task, so a cancelled caller only stops waiting for it and
+        # the other callers still get the result.
+        task = self._inflight.get(key) if key is not None else None
+        if task is None:
+            task = asyncio.ensure_future(self._request('GET', url, params=params))
+            task.add_done_callback(lambda t: self._finish_get(key, url, t))
+            if key is not None:
+                self._inflight[key] = task
+        return await asyncio.shield(task)
+    
+    def _finish_get(self, key: Optional[tuple], url: str, task: asyncio.Task):
+        """Drop a finished GET from the in-flight table and log its failure once"""
+        if key is not None and self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"GET request failed: {url} - {task.exception()}")
+    
+    async def get_streamed(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Make GET request for a large JSON payload
+        
+        Reads the body incrementally into a single buffer and parses it
+        once, instead of aiohttp buffering and then decoding it to text.
+        Not coalesced with concurrent identical requests.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+        
+        Returns:
+            Response JSON data
+        """
+        if not self.session:
+            raise RuntimeError("Session not initialized. Use async context manager.")
+        
+        url = f"{self.base_url}{endpoint}"
+        try:
+            return await self._request('GET', url, stream=True, params=params)
         except Exception as e:
             logger.error(f"GET request failed: {url} - {e}")
             raise
@@ -69,10 +420,43 @@ class APIClient:
             raise RuntimeError("Session not initialized. Use async context manager.")
         
         url = f"{self.base_url}{endpoint}"
+        kwargs: Dict[str, Any] = {'json': data}
+        if self.compress_posts:
+            body = _json_dumps(data).encode()
+            if len(body) > GZIP_MIN_BYTES:
+                kwargs = {
+                    'data': gzip.compress(body),
+                    'headers': {'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+                }
+        
         try:
-            async with self.session.post(url, json=data) as response:
-                response.raise_for_status()
-                return await response.json()
+            return await self._request('POST', url, **kwargs)
         except Exception as e:
             logger.error(f"POST request failed: {url} - {e}")
             raise
+    
+    async def get_many(
+        self,
+        requests: List[Tuple[str, Optional[Dict[str, Any]]]]
+    ) -> List[Any]:
+        """
+        Make several GET requests concurrently
+        
+        Args:
+            requests: (endpoint, params) pairs
+        
+        Returns:
+            Response JSON data per request, in order; a failed request's
+            slot holds its exception instead
+        """
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.concurrency)
+        
+        async def _one(endpoint: str, params: Optional[Dict[str, Any]]):
+            async with self._sem:
+                return await self.get(endpoint, params)
+        
+        return await asyncio.gather(
+            *(_one(endpoint, params) for endpoint, params in requests),
+            return_exceptions=True
+        )
@@ -1,10 +1,98 @@
 """
 Helper utilities for OpenClaw Trading System
 """
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Coroutine, Iterable, Iterator
+from collections import OrderedDict
+from itertools import islice
+from datetime import datetime, timedelta, time as dt_time
+from zoneinfo import ZoneInfo
+import asyncio
+import functools
+import importlib.util
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
 import numpy as np
 
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# numba is only imported when a kernel is first needed (it costs ~150ms at import)
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+# Annualization factor for daily return volatility
+SQRT_TRADING_DAYS = math.sqrt(252)
+
+# Largest moving_average window that uses np.convolve rather than prefix sums
+_CONVOLVE_MAX_WINDOW = 32
+
+# Per-thread scratch arrays for calculate_volatility, keyed by window
+_scratch = threading.local()
+
+# Regular sessions (Mon-Fri) in each exchange's local time: (tz, open, close)
+_MARKET_HOURS = {
+    "US": (ZoneInfo("America/New_York"), dt_time(9, 30), dt_time(16, 0)),
+    "KR": (ZoneInfo("Asia/Seoul"), dt_time(9, 0), dt_time(15, 30)),
+}
+
+_CURRENCY_SYMBOLS = {
+    "USD": "$",
+    "KRW": "₩",
+    "EUR": "€",
+    "GBP": "£"
+}
+
+
+def _sma_kernel(arr: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean with a running window sum"""
+    out = np.empty(arr.size - window + 1)
+    total = 0.0
+    for i in range(window):
+        total += arr[i]
+    out[0] = total / window
+    for i in range(window, arr.size):
+        total += arr[i] - arr[i - window]
+        out[i - window + 1] = total / window
+    return out
+
+
+def _vol_kernel(prices: np.ndarray) -> float:
+    """Population std of log returns, single pass with two accumulators"""
+    n = prices.size - 1
+    total = 0.0
+    sq_total = 0.0
+    for i in range(n):
+        r = np.log(prices[i + 1]) - np.log(prices[i])
+        total += r
+        sq_total += r * r
+    return math.sqrt(max(0.0, (sq_total - total * total / n) / n))
+
+
+def _vol_buffers(window: int):
+    """(log prices, returns) scratch arrays for this thread, reused across calls"""
+    buffers = getattr(_scratch, "vol", None)
+    if buffers is None:
+        buffers = _scratch.vol = {}
+    pair = buffers.get(window)
+    if pair is None:
+        pair = buffers[window] = (np.empty(window), np.empty(window - 1))
+    return pair
+
+
+@functools.lru_cache(maxsize=None)
+def _jit_kernels():
+    """JIT-compile the numeric kernels on first use"""
+    from numba import njit
+    jit = njit(cache=True, fastmath=True)
+    return jit(_sma_kernel), jit(_vol_kernel)
+
 
 def calculate_percentage_change(old_value: float, new_value: float) -> float:
     """
@@ -22,6 +110,24 @@ def calculate_percentage_change(old_value: float, new_value: float) -> float:
     return ((new_value - old_value) / old_value) * 100
 
 
+def calculate_percentage_changes(old_values: Iterable[float], new_values: Iterable[float]) -> np.ndarray:
+    """
+    Vectorized calculate_percentage_change over many value pairs
+    
+    Args:
+        old_values: Original values
+        new_values: New values
+    
+    Returns:
+        Percentage changes (0.0 where the original value is 0)
+    """
+    old = np.asarray(old_values, dtype=np.float64)
+    new = np.asarray(new_values, dtype=np.float64)
+    out = np.zeros(np.broadcast(old, new).shape)
+    np.divide((new - old) * 100, old, out=out, where=old != 0)
+    return out
+
+
 def format_currency(value: float, currency: str = "USD") -> str:
     """
     Format value as currency
@@ -33,14 +139,7 @@ def format_currency(value: float, currency: str = "USD") -> str:
     Returns:
         Formatted currency string
     """
-    symbols = {
-        "USD": "$",
-        "KRW": "₩",
-        "EUR": "€",
-        "GBP": "£"
-    }
-    symbol = symbols.get(currency, currency)
-    return f"{symbol}{value:,.2f}"
+    return f"{_CURRENCY_SYMBOLS.get(currency, currency)}{value:,.2f}"
 
 
 def calculate_volatility(prices: List[float], window: int = 20) -> float:
@@ -57,8 +156,22 @@ def calculate_volatility(prices: List[float], window: int = 20) -> float:
     if len(prices) < window:
         return 0.0
     
-    returns = np.diff(np.log(prices[-window:]))
-    return np.std(returns) * np.sqrt(252)  # Annualized
+    tail = np.asarray(prices[-window:], dtype=np.float64)
+    if tail.size < 2:
+        return 0.0
+    
+    if NUMBA_AVAILABLE:
+        return _jit_kernels()[1](tail) * SQRT_TRADING_DAYS  # Annualized
+    
+    log_prices, returns = _vol_buffers(tail.size)
+    np.log(tail, out=log_prices)
+    np.subtract(log_prices[1:], log_prices[:-1], out=returns)
+    n = returns.size
+    
+    # Population variance from sum / sum of squares (one dot product, no centred copy)
+    total = returns.sum()
+    variance = max(0.0, (np.dot(returns, returns) - total * total / n) / n)
+    return math.sqrt(variance) * SQRT_TRADING_DAYS  # Annualized
 
 
 def is_trading_hours(market: str = "US") -> bool:
@@ -71,39 +184,49 @@ def is_trading_hours(market: str = "US") -> bool:
     Returns:
         True if within trading hours
     """
-    now = datetime.now()
-    
     if market == "CRYPTO":
         return True  # Crypto trades 24/7
     
-    # Simplified check - should use market-specific timezone
-    if market == "US":
-        # US market: 9:30 AM - 4:00 PM EST (Mon-Fri)
-        if now.weekday() >= 5:  # Weekend
-            return False
-        return 9 <= now.hour < 16
+    hours = _MARKET_HOURS.get(market)
+    if hours is None:
+        return False
     
-    if market == "KR":
-        # Korean market: 9:00 AM - 3:30 PM KST (Mon-Fri)
-        if now.weekday() >= 5:  # Weekend
-            return False
-        return 9 <= now.hour < 15 or (now.hour == 15 and now.minute < 30)
-    
-    return False
+    tz, open_at, close_at = hours
+    now = datetime.now(tz)
+    return now.weekday() < 5 and open_at <= now.time() < close_at
 
 
-def chunk_list(lst: List[Any], chunk_size: int) -> List[List[Any]]:
+def chunk_list(lst: List[Any], chunk_size: int) -> Iterator[List[Any]]:
     """
     Split list into chunks
     
+    Chunks are yielded lazily; wrap in list() if all are needed at once.
+    
     Args:
         lst: Input list
         chunk_size: Size of each chunk
     
     Returns:
-        List of chunks
+        Iterator over chunks
+    """
+    for i in range(0, len(lst), chunk_size):
+        yield lst[i:i + chunk_size]
+
+
+def iter_chunks(iterable: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """
+    Split any iterable (e.g. a generator) into chunks
+    
+    Args:
+        iterable: Input items
+        chunk_size: Size of each chunk
+    
+    Returns:
+        Iterator over chunks
     """
-    return [lst[i:i + chunk_size] for i in range(0, len(lst), chunk_size)]
+    it = iter(iterable)
+    while chunk := list(islice(it, chunk_size)):
+        yield chunk
 
 
 def moving_average(data: List[float], window: int) -> List[float]:
@@ -120,7 +243,164 @@ def moving_average(data: List[float], window: int) -> List[float]:
     if len(data) < window:
         return []
     
-    result = []
-    for i in range(len(data) - window + 1):
-        result.append(sum(data[i:i + window]) / window)
-    return result
+    arr = np.ascontiguousarray(data, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _jit_kernels()[0](arr, window).tolist()
+    
+    # Small windows: direct convolution is cheap (O(n * window)) and sums each
+    # window exactly. Large windows: one prefix-sum pass keeps it O(n).
+    if window <= _CONVOLVE_MAX_WINDOW:
+        return np.convolve(arr, np.full(window, 1.0 / window), mode='valid').tolist()
+    
+    csum = np.empty(arr.size + 1)
+    csum[0] = 0.0
+    np.cumsum(arr, out=csum[1:])
+    return ((csum[window:] - csum[:-window]) / window).tolist()
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache with per-entry expiry
+    
+    Used as an L1 in front of Redis so hot keys are served from memory.
+    """
+    
+    def __init__(self, maxsize: int = 4096, ttl: float = 3600):
+        """
+        Args:
+            maxsize: Maximum number of entries (least recently used evicted)
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+    
+    def get(self, key: Any) -> Optional[Any]:
+        """Get a live value, or None if missing/expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key: Any, value: Any):
+        """Store a value, evicting the least recently used entry if full"""
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def pop(self, key: Any):
+        """Drop a key if present"""
+        self._data.pop(key, None)
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def merge_json_file(path: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge entries into a JSON object file and replace it atomically
+    
+    Entries already on disk (e.g. written by another process sharing the
+    file) are kept unless ``updates`` overrides them. Each call writes its
+    own temp file, so concurrent writers never interleave inside one file.
+    
+    Args:
+        path: JSON file holding a single object
+        updates: Entries to add or replace
+    
+    Returns:
+        The merged contents that were written
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            merged = json.load(f)
+        if not isinstance(merged, dict):
+            merged = {}
+    except (FileNotFoundError, ValueError):
+        merged = {}
+    merged.update(updates)
+    
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return merged
+
+
+async def run_in_pool(pool, fn, *args, **kwargs) -> Any:
+    """
+    Run a blocking call in a dedicated executor
+    
+    Keeps slow library calls (e.g. pykrx) off the loop's default executor.
+    
+    Args:
+        pool: Executor to run ``fn`` in
+        fn: Blocking callable
+        *args, **kwargs: Arguments for ``fn``
+    
+    Returns:
+        The call's result
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        pool, functools.partial(fn, *args, **kwargs)
+    )
+
+
+def next_poll_delay(interval: float, failures: int, loop_start: float,
+                    max_backoff: float = 300, jitter: float = 5.0) -> float:
+    """
+    Seconds to wait before the next poll
+    
+    After consecutive failures the wait backs off exponentially (capped at
+    ``max_backoff``) with random jitter; otherwise it is the rest of the
+    interval since ``loop_start``.
+    
+    Args:
+        interval: Normal poll interval in seconds
+        failures: Consecutive failed polls (0 after a success)
+        loop_start: ``time.monotonic()`` at the start of this poll
+        max_backoff: Longest wait after failures
+        jitter: Upper bound of the random delay added to backoffs
+    
+    Returns:
+        Delay in seconds
+    """
+    if failures:
+        backoff = interval * 2 ** min(failures, 10)
+        return min(max_backoff, backoff) + random.uniform(0, jitter)
+    return max(0, interval - (time.monotonic() - loop_start))
+
+
+def run_async(main: Coroutine) -> Any:
+    """
+    Run a coroutine as the program entry point
+    
+    Uses the uvloop event loop when it is installed, otherwise the
+    default asyncio loop.
+    
+    Args:
+        main: Top-level coroutine
+    
+    Returns:
+        The coroutine's result
+    """
+    if UVLOOP_AVAILABLE:
+        return uvloop.run(main)
+    return asyncio.run(main)
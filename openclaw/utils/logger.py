@@ -6,6 +6,13 @@ from pathlib import Path
 from loguru import logger
 
 
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+
 def setup_logger(log_level: str = "INFO", log_file: str = "logs/openclaw.log"):
     """
     Setup and configure the logger
@@ -24,22 +31,29 @@ def setup_logger(log_level: str = "INFO", log_file: str = "logs/openclaw.log"):
     log_path = Path(log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
     
+    # Both sinks are enqueued: formatting and I/O happen on loguru's worker
+    # thread, not the caller (queued records are flushed at exit)
+    
     # Add console handler with color
     logger.add(
         sys.stdout,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+        format=CONSOLE_FORMAT,
         level=log_level,
-        colorize=True
+        colorize=True,
+        enqueue=True
     )
     
-    # Add file handler
+    # Add file handler (no variable-value introspection on exceptions)
     logger.add(
         log_file,
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        format=FILE_FORMAT,
         level=log_level,
         rotation="100 MB",
         retention="30 days",
-        compression="zip"
+        compression="zip",
+        enqueue=True,
+        backtrace=False,
+        diagnose=False
     )
     
     return logger
@@ -1,13 +1,21 @@
 from setuptools import setup, find_packages
 
+
+def read_requirements(path):
+    return [
+        line.strip()
+        for line in open(path).readlines()
+        if line.strip() and not line.startswith('#')
+    ]
+
+
 setup(
     name="openclaw",
     version="0.1.0",
     packages=find_packages(),
-    install_requires=[
-        line.strip()
-        for line in open('requirements.txt').readlines()
-        if line.strip() and not line.startswith('#')
-    ],
+    install_requires=read_requirements('requirements.txt'),
+    extras_require={
+        'speed': read_requirements('requirements-speed.txt'),
+    },
     python_requires='>=3.11',
 )
@@ -3,48 +3,122 @@
 简化但可用的持仓管理器
 绕过原始代码的 bug
 """
-import redis
-import json
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
+import time
+from loguru import logger
+
+# redis / numpy 延迟导入，缩短 CLI 启动时间
+if TYPE_CHECKING:
+    import numpy as np
+    import redis
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+    
+    _json_loads = orjson.loads
+else:
+    import json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+
+def _json_loads_many(items: List[Any]) -> list:
+    """把多条 JSON 拼成一个数组一次解析（兼容 bytes / str 响应）"""
+    if not items:
+        return []
+    if isinstance(items[0], bytes):
+        return _json_loads(b"[" + b",".join(items) + b"]")
+    return _json_loads("[" + ",".join(items) + "]")
+
+
+# 加密货币交易对前缀（其余视为股票）
+CRYPTO_PREFIXES = ('KRW-', 'USDT-')
 
 
 class SimplePositionManager:
     """简化的持仓管理器"""
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: 'redis.Redis', log: Optional[Any] = None):
         self.redis = redis_client
+        self._log = log or logger  # 参数延迟格式化，交由 sink（可 enqueue）输出
         self.positions_key = "simple_positions"
         self.trades_key = "simple_trades"
+        
+        # HGETALL 结果的短期缓存（仪表盘连续刷新时复用），写操作会使其失效
+        self.positions_cache_ttl = 0.5  # 秒
+        self._positions_raw: Optional[Dict[str, str]] = None
+        self._positions_raw_ts = 0.0
     
-    def open_position(self, symbol: str, quantity: float, entry_price: float, note: str = ""):
-        """开仓"""
+    @staticmethod
+    def _open_records(symbol: str, quantity: float, entry_price: float, note: str = "") -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """生成开仓的 (持仓, 交易记录)"""
+        now = datetime.now().isoformat()
         position = {
             'symbol': symbol,
             'quantity': quantity,
             'entry_price': entry_price,
-            'entry_time': datetime.now().isoformat(),
+            'entry_time': now,
             'cost': quantity * entry_price,
             'note': note
         }
-        
-        # 保存到 Redis
-        self.redis.hset(self.positions_key, symbol, json.dumps(position))
-        
-        # 记录交易
         trade = {
             'symbol': symbol,
             'action': 'OPEN',
             'quantity': quantity,
             'price': entry_price,
-            'time': datetime.now().isoformat(),
+            'time': now,
             'note': note
         }
-        self.redis.lpush(self.trades_key, json.dumps(trade))
+        return position, trade
+    
+    def open_position(self, symbol: str, quantity: float, entry_price: float, note: str = ""):
+        """开仓"""
+        position, trade = self._open_records(symbol, quantity, entry_price, note)
+        
+        # 持仓和交易记录一次往返写入（MULTI 保证两者一致）
+        with self.redis.pipeline() as pipe:
+            pipe.hset(self.positions_key, symbol, _json_dumps(position))
+            pipe.lpush(self.trades_key, _json_dumps(trade))
+            pipe.execute()
+        self.invalidate_positions_cache()
         
-        print(f"✅ 开仓: {symbol} {quantity} @ ₩{entry_price:,.0f}")
+        self._log.info("✅ 开仓: {} {} @ ₩{:,.0f}", symbol, quantity, entry_price)
         return position
     
+    def open_positions_bulk(self, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量开仓，所有写入在一次往返内完成
+        
+        Args:
+            orders: 每项包含 symbol, quantity, entry_price，可选 note
+        
+        Returns:
+            新建的持仓列表
+        """
+        positions = []
+        with self.redis.pipeline(transaction=False) as pipe:
+            for order in orders:
+                position, trade = self._open_records(
+                    order['symbol'], order['quantity'], order['entry_price'], order.get('note', '')
+                )
+                pipe.hset(self.positions_key, position['symbol'], _json_dumps(position))
+                pipe.lpush(self.trades_key, _json_dumps(trade))
+                positions.append(position)
+            pipe.execute()
+        self.invalidate_positions_cache()
+        
+        self._log.info("✅ 批量开仓: {} 个", len(positions))
+        return positions
+    
     def close_position(self, symbol: str, exit_price: float, note: str = ""):
         """平仓"""
         position_data = self.redis.hget(self.positions_key, symbol)
@@ -52,7 +126,7 @@ class SimplePositionManager:
         if not position_data:
             raise ValueError(f"Position {symbol} not found")
         
-        position = json.loads(position_data)
+        position = _json_loads(position_data)
         
         # 计算盈亏
         quantity = position['quantity']
@@ -71,141 +145,149 @@ class SimplePositionManager:
             'time': datetime.now().isoformat(),
             'note': note
         }
-        self.redis.lpush(self.trades_key, json.dumps(trade))
         
-        # 删除持仓
-        self.redis.hdel(self.positions_key, symbol)
+        # 记录交易并删除持仓（一次往返）
+        with self.redis.pipeline() as pipe:
+            pipe.lpush(self.trades_key, _json_dumps(trade))
+            pipe.hdel(self.positions_key, symbol)
+            pipe.execute()
+        self.invalidate_positions_cache()
         
-        print(f"✅ 平仓: {symbol} PnL: ₩{pnl:,.0f} ({pnl_pct:+.2f}%)")
+        self._log.info("✅ 平仓: {} PnL: ₩{:,.0f} ({:+.2f}%)", symbol, pnl, pnl_pct)
         return trade
     
     def get_position(self, symbol: str) -> Optional[Dict[str, Any]]:
         """获取单个持仓"""
         position_data = self.redis.hget(self.positions_key, symbol)
         if position_data:
-            return json.loads(position_data)
+            return _json_loads(position_data)
         return None
     
     def get_all_positions(self) -> Dict[str, Dict[str, Any]]:
         """获取所有持仓"""
-        positions = {}
-        for symbol, data in self.redis.hgetall(self.positions_key).items():
-            positions[symbol] = json.loads(data)
-        return positions
+        return self._decode_positions(self._get_positions_raw())
+    
+    def _get_positions_raw(self) -> Dict[str, str]:
+        """持仓哈希原始数据，TTL 内直接复用（每次仍解码出新字典，调用方可随意修改）"""
+        now = time.monotonic()
+        if self._positions_raw is not None and now - self._positions_raw_ts < self.positions_cache_ttl:
+            return self._positions_raw
+        
+        self._positions_raw = self.redis.hgetall(self.positions_key)
+        self._positions_raw_ts = now
+        return self._positions_raw
+    
+    def invalidate_positions_cache(self):
+        """丢弃缓存的持仓（其他进程写入后可手动调用）"""
+        self._positions_raw = None
+    
+    @staticmethod
+    def _decode_positions(raw: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        return dict(SimplePositionManager._iter_positions(raw))
+    
+    @staticmethod
+    def _iter_positions(raw: Dict[str, str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """逐个解析持仓（不构建中间字典）"""
+        for symbol, data in raw.items():
+            yield symbol, _json_loads(data)
+    
+    @staticmethod
+    def _partition(positions: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """一次遍历拆分为 (股票, 加密货币)"""
+        stocks, crypto = {}, {}
+        for symbol, pos in positions.items():
+            (crypto if symbol.startswith(CRYPTO_PREFIXES) else stocks)[symbol] = pos
+        return stocks, crypto
     
     def get_stock_positions(self) -> Dict[str, Dict[str, Any]]:
         """获取股票持仓"""
-        all_positions = self.get_all_positions()
-        return {
-            symbol: pos for symbol, pos in all_positions.items()
-            if not symbol.startswith('KRW-') and not symbol.startswith('USDT-')
-        }
+        return self._partition(self.get_all_positions())[0]
     
     def get_crypto_positions(self) -> Dict[str, Dict[str, Any]]:
         """获取加密货币持仓"""
-        all_positions = self.get_all_positions()
+        return self._partition(self.get_all_positions())[1]
+    
+    @staticmethod
+    def _position_arrays(positions: Iterable[Tuple[str, Dict[str, Any]]], n: int, current_prices: Dict[str, float]) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """一次遍历 n 个 (代码, 持仓)，构建 (成本, 市值, 是否加密货币) 数组"""
+        import numpy as np
+        
+        cost = np.empty(n)
+        value = np.empty(n)
+        is_crypto = np.empty(n, dtype=bool)
+        get_price = current_prices.get
+        for i, (symbol, pos) in enumerate(positions):
+            cost[i] = pos['cost']
+            value[i] = pos['quantity'] * get_price(symbol, pos['entry_price'])
+            is_crypto[i] = symbol.startswith(CRYPTO_PREFIXES)
+        return cost, value, is_crypto
+    
+    @staticmethod
+    def _summarize(count: int, cost: float, value: float) -> Dict[str, Any]:
+        pnl = value - cost
         return {
-            symbol: pos for symbol, pos in all_positions.items()
-            if symbol.startswith('KRW-') or symbol.startswith('USDT-')
+            'count': count,
+            'total_cost': cost,
+            'total_value': value,
+            'total_pnl': pnl,
+            'total_pnl_pct': (pnl / cost * 100) if cost > 0 else 0,
         }
     
     def calculate_portfolio_value(self, current_prices: Dict[str, float]) -> Dict[str, Any]:
         """计算组合价值"""
-        positions = self.get_all_positions()
-        
-        total_cost = 0
-        total_value = 0
+        raw = self._get_positions_raw()
+        cost, value, _ = self._position_arrays(self._iter_positions(raw), len(raw), current_prices)
         
-        for symbol, position in positions.items():
-            cost = position['cost']
-            current_price = current_prices.get(symbol, position['entry_price'])
-            value = position['quantity'] * current_price
-            
-            total_cost += cost
-            total_value += value
-        
-        total_pnl = total_value - total_cost
-        total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
-        
-        return {
-            'total_cost': total_cost,
-            'total_value': total_value,
-            'total_pnl': total_pnl,
-            'total_pnl_pct': total_pnl_pct,
-            'count': len(positions)
-        }
+        return self._summarize(len(raw), float(cost.sum()), float(value.sum()))
     
     def calculate_portfolio_by_type(self, current_prices: Dict[str, float]) -> Dict[str, Any]:
         """按类型计算组合"""
-        stock_positions = self.get_stock_positions()
-        crypto_positions = self.get_crypto_positions()
-        
-        # 计算股票
-        stocks_cost = 0
-        stocks_value = 0
-        for symbol, position in stock_positions.items():
-            stocks_cost += position['cost']
-            current_price = current_prices.get(symbol, position['entry_price'])
-            stocks_value += position['quantity'] * current_price
-        
-        stocks_pnl = stocks_value - stocks_cost
-        stocks_pnl_pct = (stocks_pnl / stocks_cost * 100) if stocks_cost > 0 else 0
-        
-        # 计算加密货币
-        crypto_cost = 0
-        crypto_value = 0
-        for symbol, position in crypto_positions.items():
-            crypto_cost += position['cost']
-            current_price = current_prices.get(symbol, position['entry_price'])
-            crypto_value += position['quantity'] * current_price
-        
-        crypto_pnl = crypto_value - crypto_cost
-        crypto_pnl_pct = (crypto_pnl / crypto_cost * 100) if crypto_cost > 0 else 0
-        
-        # 总计
-        total_cost = stocks_cost + crypto_cost
-        total_value = stocks_value + crypto_value
-        total_pnl = total_value - total_cost
-        total_pnl_pct = (total_pnl / total_cost * 100) if total_cost > 0 else 0
+        raw = self._get_positions_raw()
+        cost, value, is_crypto = self._position_arrays(self._iter_positions(raw), len(raw), current_prices)
+        is_stock = ~is_crypto
+        
+        stocks = self._summarize(int(is_stock.sum()), float(cost[is_stock].sum()), float(value[is_stock].sum()))
+        crypto = self._summarize(int(is_crypto.sum()), float(cost[is_crypto].sum()), float(value[is_crypto].sum()))
+        total = self._summarize(
+            stocks['count'] + crypto['count'],
+            stocks['total_cost'] + crypto['total_cost'],
+            stocks['total_value'] + crypto['total_value']
+        )
         
         return {
-            'stocks': {
-                'count': len(stock_positions),
-                'total_cost': stocks_cost,
-                'total_value': stocks_value,
-                'total_pnl': stocks_pnl,
-                'total_pnl_pct': stocks_pnl_pct,
-            },
-            'crypto': {
-                'count': len(crypto_positions),
-                'total_cost': crypto_cost,
-                'total_value': crypto_value,
-                'total_pnl': crypto_pnl,
-                'total_pnl_pct': crypto_pnl_pct,
-            },
-            'total': {
-                'count': len(stock_positions) + len(crypto_positions),
-                'total_cost': total_cost,
-                'total_value': total_value,
-                'total_pnl': total_pnl,
-                'total_pnl_pct': total_pnl_pct,
-            }
+            'stocks': stocks,
+            'crypto': crypto,
+            'total': total
         }
     
     def get_trades_history(self, limit: int = 50) -> list:
         """获取交易历史"""
-        trades_data = self.redis.lrange(self.trades_key, 0, limit - 1)
-        return [json.loads(trade) for trade in trades_data]
+        return _json_loads_many(self.redis.lrange(self.trades_key, 0, limit - 1))
+    
+    def get_positions_and_trades(self, limit: int = 50) -> Tuple[Dict[str, Dict[str, Any]], list]:
+        """一次往返同时获取所有持仓和交易历史"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hgetall(self.positions_key)
+        pipe.lrange(self.trades_key, 0, limit - 1)
+        positions, trades_data = pipe.execute()
+        return self._decode_positions(positions), _json_loads_many(trades_data)
     
     def clear_all(self):
         """清除所有数据"""
         self.redis.delete(self.positions_key)
         self.redis.delete(self.trades_key)
-        print("✅ 所有数据已清除")
+        self.invalidate_positions_cache()
+        self._log.info("✅ 所有数据已清除")
 
 
 # 测试
 if __name__ == '__main__':
+    import sys
+    import redis
+    
+    logger.remove()
+    logger.add(sys.stderr, format="{message}", enqueue=True)
+    
     print("🧪 测试 SimplePositionManager")
     print("="*60)
     
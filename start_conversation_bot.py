@@ -4,11 +4,23 @@
 """
 import os
 import asyncio
+import threading
 from dotenv import load_dotenv
 from openclaw.skills.execution.position_tracker import PositionTracker
 from telegram_bot_standalone import OpenClawTelegramBot
 from loguru import logger
 
+
+def _warmup():
+    """后台预热数值内核（numba 编译/读取缓存），避免首条消息承担冷启动开销"""
+    try:
+        from openclaw.utils.helpers import moving_average, calculate_volatility
+        moving_average([1.0] * 64, 20)
+        calculate_volatility([1.0] * 64, 20)
+    except Exception as e:
+        logger.debug(f"预热失败（忽略）: {e}")
+
+
 def main():
     # 加载环境变量
     load_dotenv()
@@ -36,6 +48,8 @@ def main():
     logger.info("🚀 启动 OpenClaw Telegram Bot (自然语言对话版)")
     logger.info(f"   授权用户: {authorized_users}")
     
+    threading.Thread(target=_warmup, name="warmup", daemon=True).start()
+    
     # 初始化持仓跟踪器
     tracker = PositionTracker(initial_capital=0.0)  # 初始资金为0，实际资金通过"调整总资产"命令设置
     
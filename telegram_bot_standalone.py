@@ -5,9 +5,17 @@ OpenClaw Telegram Bot (独立版 - 完整功能)
 """
 import os
 import sys
+import json
+import functools
+import hashlib
+import random
 import asyncio
-from typing import Dict, Any, Optional
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Mapping, Optional, Tuple
+from datetime import datetime, time as dt_time, timedelta
+from types import MappingProxyType
+import numpy as np
 
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -15,21 +23,30 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from loguru import logger
 
 try:
-    from telegram import Update, Bot
+    from telegram import Update
     from telegram.ext import (
         Application,
+        BaseRateLimiter,
         CommandHandler,
+        ExtBot,
         MessageHandler,
         filters,
         ContextTypes
     )
-    from telegram.request import HTTPXRequest
+    from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
     from telegram.request import HTTPXRequest
     TELEGRAM_AVAILABLE = True
 except ImportError:
     TELEGRAM_AVAILABLE = False
     logger.error("python-telegram-bot 未安装")
 
+# HTTP/2：并发 sendMessage 复用同一条 TLS 连接（需 h2）
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
 try:
     from pykrx import stock as pykrx_stock
     PYKRX_AVAILABLE = True
@@ -39,6 +56,8 @@ except ImportError:
 from openclaw.skills.execution.position_tracker import PositionTracker
 from openclaw.skills.analysis.ai_trading_advisor import AITradingAdvisor
 from openclaw.skills.analysis.conversation_handler import ConversationHandler
+from openclaw.utils import api_client
+from openclaw.utils.helpers import TTLCache, merge_json_file, run_in_pool
 
 # 金额/价格格式化辅助（不四舍五入）
 _fw  = ConversationHandler._fmt_price   # 无符号：₩1,234.5
@@ -77,41 +96,196 @@ except ImportError:
     logger.warning("announcement_monitor 未找到")
 
 
+# 加密货币交易对前缀（其余视为股票）
+_CRYPTO_PREFIXES = ('KRW-', 'USDT-')
+
+# 单条消息长度上限（Telegram 为 4096，留出余量）
+MAX_MESSAGE_CHARS = 4000
+
+
+def _chunk_parts(parts, limit: int = MAX_MESSAGE_CHARS):
+    """按段拼接消息，每块不超过 limit（段本身过长时再硬切）"""
+    chunk, size = [], 0
+    for part in parts:
+        if size + len(part) > limit and chunk:
+            yield "".join(chunk)
+            chunk, size = [], 0
+        while len(part) > limit:
+            yield part[:limit]
+            part = part[limit:]
+        chunk.append(part)
+        size += len(part)
+    if chunk:
+        yield "".join(chunk)
+
+
+class _SendRateLimiter(BaseRateLimiter if TELEGRAM_AVAILABLE else object):
+    """
+    所有 Bot API 调用的统一节流（挂在 ExtBot 上，回复/广播/置顶都经过这里）
+    
+    全局约 30 条/秒；同一 chat 私聊 1 条/秒、群组 20 条/分钟。
+    按预约时间槽排队：先等到本 chat 的槽，再占全局槽（避免一个 chat 排队拖慢其他 chat）。
+    不带 chat_id 的调用（getUpdates、getMe 等）直接放行。
+    
+    失败重试：RetryAfter 按服务端给的 retry_after 等待（期间该 chat 的后续请求一并顺延）；
+    网络错误按指数退避 + 抖动重试，最多 max_attempts 次。
+    """
+    
+    # 槽位表超过此大小时清理已过期的 chat 条目
+    PRUNE_THRESHOLD = 1024
+    
+    def __init__(
+        self,
+        overall_rate: float = 28,
+        private_interval: float = 1.0,
+        group_interval: float = 3.0,
+        max_attempts: int = 8,
+        max_backoff: float = 60.0,
+    ):
+        self._overall_interval = 1.0 / overall_rate
+        self._private_interval = private_interval
+        self._group_interval = group_interval
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self._next_at = 0.0
+        self._chat_next_at: Dict[str, float] = {}
+        self._retry_until: Dict[str, float] = {}  # chat_id -> RetryAfter 惩罚期结束时间
+    
+    def is_flood_limited(self, chat_id) -> bool:
+        """该 chat 是否仍处于 RetryAfter 惩罚期（置顶循环据此跳过本轮编辑）"""
+        until = self._retry_until.get(str(chat_id))
+        return until is not None and until > asyncio.get_running_loop().time()
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
+    
+    async def process_request(self, callback, args, kwargs, endpoint, data, rate_limit_args):
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            return await callback(*args, **kwargs)
+        
+        chat_id = str(chat_id)
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.max_attempts + 1):
+            await self._acquire(loop, chat_id)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                delay = e.retry_after + random.uniform(0, 0.5)
+                # 惩罚期内该 chat 不再发任何请求
+                until = loop.time() + delay
+                self._retry_until[chat_id] = until
+                self._chat_next_at[chat_id] = max(self._chat_next_at.get(chat_id, 0.0), until)
+                if attempt == self.max_attempts:
+                    raise
+                logger.warning(f"{endpoint} 触发限流 chat_id={chat_id}，{delay:.1f}s 后重试（第 {attempt} 次）")
+            except BadRequest:
+                raise
+            except NetworkError as e:
+                # 发送消息超时可能已送达，重试会重复发送
+                if isinstance(e, TimedOut) and endpoint == 'sendMessage':
+                    raise
+                if attempt == self.max_attempts:
+                    raise
+                delay = min(self.max_backoff, 2 ** attempt) + random.random()
+                logger.warning(f"{endpoint} 网络错误 chat_id={chat_id}: {e}，{delay:.1f}s 后重试（第 {attempt} 次）")
+                await asyncio.sleep(delay)
+    
+    def _prune(self, now: float) -> None:
+        """丢弃槽位与惩罚期都已过去的 chat（对它们而言等同于从未发送过）"""
+        self._chat_next_at = {c: t for c, t in self._chat_next_at.items() if t > now}
+        self._retry_until = {c: t for c, t in self._retry_until.items() if t > now}
+    
+    async def _acquire(self, loop, chat_id: str) -> None:
+        """等到本 chat 与全局都有空闲时间槽"""
+        # 单线程事件循环内读写槽位之间没有 await，无需加锁
+        now = loop.time()
+        if len(self._chat_next_at) > self.PRUNE_THRESHOLD:
+            self._prune(now)
+        interval = self._group_interval if chat_id.startswith('-') else self._private_interval
+        start = max(now, self._chat_next_at.get(chat_id, 0.0))
+        self._chat_next_at[chat_id] = start + interval
+        if start > now:
+            await asyncio.sleep(start - now)
+            now = loop.time()
+        
+        start = max(now, self._next_at)
+        self._next_at = start + self._overall_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
 class SimplePortfolioManager:
     """简化的组合管理器"""
     
+    _CRYPTO_PREFIXES = _CRYPTO_PREFIXES
+    
     def __init__(self, tracker: PositionTracker):
         self.tracker = tracker
+        # 按 tracker.version 缓存分类结果（持仓、成本合计、数量/成本价数组），持仓变动前重复命令无需重建
+        self._split_key = None
+        self._split_cache = (self._bucket({}), self._bucket({}))
     
-    def get_stock_positions(self) -> Dict:
+    @staticmethod
+    def _bucket(positions: Dict) -> Dict[str, Any]:
+        n = len(positions)
         return {
-            symbol: pos for symbol, pos in self.tracker.positions.items()
-            if not symbol.startswith('KRW-') and not symbol.startswith('USDT-')
+            'positions': positions,
+            'cost': float(sum(pos['total_cost'] for pos in positions.values())),
+            'symbols': list(positions),
+            'quantities': np.fromiter((pos['quantity'] for pos in positions.values()), dtype=np.float64, count=n),
+            'entry_prices': np.fromiter((pos['avg_entry_price'] for pos in positions.values()), dtype=np.float64, count=n),
         }
     
-    def get_crypto_positions(self) -> Dict:
-        return {
-            symbol: pos for symbol, pos in self.tracker.positions.items()
-            if symbol.startswith('KRW-') or symbol.startswith('USDT-')
-        }
+    def _cached_split(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """(股票, 加密货币) 两个分组，持仓未变时复用"""
+        positions = self.tracker.positions
+        key = (id(positions), getattr(self.tracker, 'version', None), len(positions))
+        if key[1] is None or key != self._split_key:
+            stocks, crypto = {}, {}
+            for symbol, pos in positions.items():
+                (crypto if symbol.startswith(self._CRYPTO_PREFIXES) else stocks)[symbol] = pos
+            self._split_cache = (self._bucket(stocks), self._bucket(crypto))
+            self._split_key = key
+        return self._split_cache
+    
+    def _split_positions(self) -> Tuple[Mapping, Mapping]:
+        """(股票, 加密货币) 只读视图（O(1)，不复制；持仓变动后会换成新的分组）"""
+        stocks, crypto = self._cached_split()
+        return MappingProxyType(stocks['positions']), MappingProxyType(crypto['positions'])
+    
+    @staticmethod
+    def _market_value(bucket: Dict[str, Any], current_prices: Dict[str, float]) -> float:
+        """数量 · 现价 的点积（无现价时用成本价）"""
+        if not bucket['symbols']:
+            return 0.0
+        get_price = current_prices.get
+        prices = np.fromiter(
+            (get_price(symbol, entry) for symbol, entry in zip(bucket['symbols'], bucket['entry_prices'].tolist())),
+            dtype=np.float64, count=len(bucket['symbols'])
+        )
+        return float(np.vdot(bucket['quantities'], prices))
+    
+    def get_stock_positions(self) -> Mapping:
+        return self._split_positions()[0]
+    
+    def get_crypto_positions(self) -> Mapping:
+        return self._split_positions()[1]
     
     def get_portfolio_by_type(self, current_prices: Dict[str, float]) -> Dict:
-        stock_positions = self.get_stock_positions()
-        crypto_positions = self.get_crypto_positions()
+        stocks, crypto = self._cached_split()
+        stock_positions, crypto_positions = self._split_positions()
         
-        stocks_cost = sum(pos['total_cost'] for pos in stock_positions.values())
-        stocks_value = sum(
-            pos['quantity'] * current_prices.get(symbol, pos['avg_entry_price'])
-            for symbol, pos in stock_positions.items()
-        )
+        stocks_cost = stocks['cost']
+        stocks_value = self._market_value(stocks, current_prices)
         stocks_pnl = stocks_value - stocks_cost
         stocks_pnl_pct = (stocks_pnl / stocks_cost * 100) if stocks_cost > 0 else 0
         
-        crypto_cost = sum(pos['total_cost'] for pos in crypto_positions.values())
-        crypto_value = sum(
-            pos['quantity'] * current_prices.get(symbol, pos['avg_entry_price'])
-            for symbol, pos in crypto_positions.items()
-        )
+        crypto_cost = crypto['cost']
+        crypto_value = self._market_value(crypto, current_prices)
         crypto_pnl = crypto_value - crypto_cost
         crypto_pnl_pct = (crypto_pnl / crypto_cost * 100) if crypto_cost > 0 else 0
         
@@ -152,6 +326,20 @@ class SimplePortfolioManager:
 class OpenClawTelegramBot:
     """OpenClaw Telegram Bot"""
     
+    # 广播同时在途请求数上限（发送速率由 _SendRateLimiter 统一控制）
+    BROADCAST_CONCURRENCY = 5
+    ALERT_QUEUE_SIZE = 512
+    OHLCV_CACHE_TTL = 60  # 秒，/analyze 同一代码短时间内重复查询时复用
+    OHLCV_CACHE_SIZE = 256  # 最多缓存的代码数（超出按 LRU 淘汰）
+    PYKRX_WORKERS = 4
+    PIN_REFRESH_INTERVAL = 30  # 秒，无交易时的置顶刷新周期
+    PIN_DEBOUNCE = 1.5  # 秒，交易触发刷新后合并这段时间内的后续触发
+    # getUpdates 长轮询时长（秒）；带宽受限的部署可用 TG_POLL_TIMEOUT 调整
+    POLL_TIMEOUT = int(os.getenv('TG_POLL_TIMEOUT', '30'))
+    # 告警合并：窗口内到达的告警拼成一条消息（Telegram 单条上限 4096 字符）
+    ALERT_SEPARATOR = "\n\n━━━\n\n"
+    _ALERT_SEVERITY_RANK = {'CRITICAL': 0, 'HIGH': 1}
+    
     def __init__(
         self,
         token: str,
@@ -176,19 +364,50 @@ class OpenClawTelegramBot:
         _bcast_set: set = {str(chat_id)}
         if authorized_users:
             _bcast_set.update(str(uid) for uid in authorized_users)
-        self.broadcast_ids: list = list(_bcast_set)
+        self.broadcast_ids: frozenset = frozenset(_bcast_set)
+        self._broadcast_sem = asyncio.Semaphore(self.BROADCAST_CONCURRENCY)
+        self._chat_locks: Dict[Any, list] = {}  # chat_id -> [锁, 在途数]（命令处理保序，空闲即移除）
+        # 告警队列：tracker 回调只入队，由 run() 中的单个消费任务负责广播
+        self._alert_queue: Optional[asyncio.Queue] = None
+        self._alert_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.alert_flush_interval = 0.5  # 秒
+        self.alert_max_chars = 4000
         
-        self.bot = Bot(token=token)
+        # 单一连接池：主动推送与 Application 共用同一个 bot（getUpdates 长轮询单独一个池）
+        # 自动读取环境变量中的代理配置（适配 WSL2/防火墙环境）
+        self._proxy_url = os.environ.get('HTTPS_PROXY') or os.environ.get('HTTP_PROXY') or None
+        self._rate_limiter = _SendRateLimiter()
+        self.bot = ExtBot(
+            token=token,
+            request=HTTPXRequest(
+                connection_pool_size=32, pool_timeout=5.0, read_timeout=10.0, proxy=self._proxy_url,
+                http_version="2" if H2_AVAILABLE else "1.1",
+            ),
+            get_updates_request=HTTPXRequest(connection_pool_size=1, proxy=self._proxy_url),
+            rate_limiter=self._rate_limiter,
+        )
         self.app = None
         
-        self.stock_names_cache = {}
+        # 名称缓存持久化到磁盘（与账户状态同目录），重启后无需再逐个查询 pykrx
+        self._names_cache_path = os.path.join(
+            os.path.dirname(state_file) if state_file else 'data', 'stock_names.json'
+        )
+        self._names_cache_lock = threading.Lock()  # 并发查询时串行化写盘
+        self._ohlcv_cache = TTLCache(maxsize=self.OHLCV_CACHE_SIZE, ttl=self.OHLCV_CACHE_TTL)  # symbol -> DataFrame
+        self._pykrx_pool = ThreadPoolExecutor(max_workers=self.PYKRX_WORKERS, thread_name_prefix='pykrx')
         # 置顶消息 ID：每个广播用户独立维护 {cid: message_id}
         self._pinned_msg_ids: dict = {}
+        # 置顶刷新：交易后 set() 唤醒循环；按内容摘要跳过无变化的编辑（b'' 表示已取消置顶）
+        self._pin_dirty = asyncio.Event()
+        self._pin_last_hash: Dict[str, bytes] = {}
+        self._pin_sem = asyncio.Semaphore(8)  # 置顶 fan-out 的并发上限
         self.stock_names_map = {
             '005930': '삼성전자', '000660': 'SK하이닉스', '035420': 'NAVER',
             '035720': '카카오', '051910': 'LG화학', '006400': '삼성SDI',
             'KRW-BTC': 'Bitcoin', 'KRW-ETH': 'Ethereum',
         }
+        # 本地映射预先并入缓存（磁盘缓存优先），热路径只需一次 dict 查找
+        self.stock_names_cache = {**self.stock_names_map, **self._load_names_cache()}
         
         # 初始化AI交易顾问
         self.ai_advisor = AITradingAdvisor()
@@ -280,30 +499,172 @@ class OpenClawTelegramBot:
             
             full_message = prefix + message
             
-            # 挂到已运行的 event loop（不创建新 loop，避免连接池冲突）
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(self._broadcast(full_message))
-            except RuntimeError:
-                asyncio.run(self._broadcast(full_message))
-            
-            logger.info(f"📧 告警消息已发送: {alert['type']}")
+            self._enqueue_alert(full_message, severity)
+            logger.info(f"📧 告警消息已入队: {alert['type']}")
             
         except Exception as e:
             logger.error(f"发送告警消息失败: {e}")
     
+    def _enqueue_alert(self, text: str, severity: str = 'INFO'):
+        """告警入队（可从其他线程调用）；bot 未运行或队列已满时丢弃并记录"""
+        if self._alert_queue is None:
+            logger.warning(f"Bot 未运行，告警未发送: {text[:50]}")
+            return
+        
+        def _put():
+            try:
+                self._alert_queue.put_nowait((severity, text))
+            except asyncio.QueueFull:
+                logger.warning(f"告警队列已满，丢弃: {text[:50]}")
+        
+        try:
+            in_loop = asyncio.get_running_loop() is self._alert_loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            _put()
+        else:
+            self._alert_loop.call_soon_threadsafe(_put)
+    
+    async def _alert_drain(self):
+        """
+        广播队列中的告警（慢 chat 不阻塞回调方）
+        
+        首条到达后最多再等 alert_flush_interval 秒，期间到达的告警合并为一条
+        （不超过 alert_max_chars），按严重程度排序后一次广播。
+        """
+        loop = asyncio.get_running_loop()
+        pending = None
+        while True:
+            batch = [pending or await self._alert_queue.get()]
+            pending = None
+            size = len(batch[0][1])
+            deadline = loop.time() + self.alert_flush_interval
+            
+            while (timeout := deadline - loop.time()) > 0:
+                try:
+                    item = await asyncio.wait_for(self._alert_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                size += len(self.ALERT_SEPARATOR) + len(item[1])
+                if size > self.alert_max_chars:
+                    pending = item  # 留给下一批
+                    break
+                batch.append(item)
+            
+            batch.sort(key=lambda item: self._ALERT_SEVERITY_RANK.get(item[0], 2))
+            try:
+                await self._broadcast(self.ALERT_SEPARATOR.join(text for _, text in batch))
+            except Exception as e:
+                logger.error(f"发送告警消息失败: {e}")
+            finally:
+                for _ in batch:
+                    self._alert_queue.task_done()
+    
     async def _broadcast(self, text: str, **kwargs) -> None:
         """向所有白名单用户广播消息（主动推送专用，不影响回复类消息）"""
         _bot = self.app.bot if self.app else self.bot
+        
+        async def _send_one(cid):
+            async with self._broadcast_sem:
+                return await _bot.send_message(chat_id=cid, text=text, **kwargs)
+        
+        targets = tuple(self.broadcast_ids)
         results = await asyncio.gather(
-            *[_bot.send_message(chat_id=cid, text=text, **kwargs)
-              for cid in self.broadcast_ids],
+            *[_send_one(cid) for cid in targets],
             return_exceptions=True,
         )
-        for cid, r in zip(self.broadcast_ids, results):
+        for cid, r in zip(targets, results):
             if isinstance(r, Exception):
                 logger.warning(f"广播失败 chat_id={cid}: {r}")
 
+    def _per_chat(self, handler):
+        """同一 chat 的更新按到达顺序串行处理（concurrent_updates 下保序）"""
+        @functools.wraps(handler)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            chat_id = update.effective_chat.id if update.effective_chat else None
+            entry = self._chat_locks.get(chat_id)
+            if entry is None:
+                entry = self._chat_locks[chat_id] = [asyncio.Lock(), 0]
+            entry[1] += 1
+            try:
+                async with entry[0]:
+                    return await handler(update, context)
+            finally:
+                # 没有排队中的更新时释放条目，陌生 chat 不会让字典无限增长
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._chat_locks[chat_id]
+        return wrapper
+    
+    async def _reconcile_pin(self, cid: str, text: Optional[str], digest: bytes = b''):
+        """让单个 chat 的置顶与期望状态一致：text 非空 → 置顶该内容；为空 → 无置顶"""
+        async with self._pin_sem:
+            if not text:
+                await self._clear_pin(cid)
+                return
+            mid = self._pinned_msg_ids.get(cid)
+            if mid is None or not await self._edit_pin(cid, mid, text):
+                await self._create_pin(cid, text)
+            self._pin_last_hash[cid] = digest
+    
+    async def _create_pin(self, cid: str, text: str):
+        """发送新消息并置顶（置顶失败只记录，消息ID仍保留供后续编辑）"""
+        msg = await self.app.bot.send_message(chat_id=cid, text=text)
+        self._pinned_msg_ids[cid] = msg.message_id
+        try:
+            await self.app.bot.pin_chat_message(
+                chat_id=cid,
+                message_id=msg.message_id,
+                disable_notification=True,
+            )
+        except Exception as _pe:
+            logger.warning(f"置顶失败 cid={cid}: {_pe}")
+        logger.info(f"📌 置顶消息已创建 cid={cid} msg_id={msg.message_id}")
+    
+    async def _edit_pin(self, cid: str, mid: int, text: str) -> bool:
+        """编辑已有置顶消息；消息已不可编辑（被删除等）时丢弃记录并返回 False"""
+        try:
+            await self.app.bot.edit_message_text(chat_id=cid, message_id=mid, text=text)
+        except BadRequest as _be:
+            # 内容与线上一致：视为成功，不因此重建置顶
+            if 'not modified' in str(_be).lower():
+                return True
+            logger.warning(f"编辑置顶失败 cid={cid}: {_be}，将重新创建")
+            self._pinned_msg_ids.pop(cid, None)
+            return False
+        return True
+    
+    async def _clear_pin(self, cid: str):
+        """取消单个 chat 的置顶（多种方式兜底，异常只记录）"""
+        self._pin_last_hash[cid] = b''
+        mid = self._pinned_msg_ids.pop(cid, None)
+        if mid is not None:
+            try:
+                await self.app.bot.unpin_chat_message(chat_id=cid, message_id=mid)
+                logger.info(f"📌 持仓清空，cid={cid} mid={mid} 置顶已取消")
+            except Exception as _upe:
+                logger.warning(f"取消置顶失败 cid={cid}: {_upe}，尝试删除消息")
+                try:
+                    await self.app.bot.delete_message(chat_id=cid, message_id=mid)
+                    logger.info(f"📌 置顶消息已删除 cid={cid} mid={mid}")
+                except Exception as _de:
+                    logger.warning(f"删除置顶消息也失败 cid={cid}: {_de}")
+            return
+        # 没有记录的消息ID（如机器人重启后）→ 兜底方案
+        try:
+            # 私聊中：unpin_chat_message() 不传 message_id 会取消当前置顶的消息
+            await self.app.bot.unpin_chat_message(chat_id=cid)
+            logger.info(f"📌 已取消 cid={cid} 当前置顶消息（无message_id方式）")
+        except Exception as _upe1:
+            logger.debug(f"unpin_chat_message(无mid)失败: {_upe1}")
+            # 群组中：使用 unpin_all
+            try:
+                await self.app.bot.unpin_all_chat_messages(chat_id=cid)
+                logger.info(f"📌 已取消 cid={cid} 全部置顶（unpin_all）")
+            except Exception as _upa:
+                logger.warning(f"📌 所有取消置顶方式均失败 cid={cid}: {_upa}")
+    
     def _is_authorized(self, user_id: int) -> bool:
         """检查用户是否有权限使用bot"""
         if self.authorized_users is None:
@@ -328,31 +689,71 @@ class OpenClawTelegramBot:
         logger.info(f"✅ 授权用户访问: {username} (ID: {user_id})")
         return True
     
-    async def get_stock_name(self, symbol: str) -> str:
-        if symbol in self.stock_names_cache:
-            return self.stock_names_cache[symbol]
-        
-        if symbol in self.stock_names_map:
-            self.stock_names_cache[symbol] = self.stock_names_map[symbol]
-            return self.stock_names_map[symbol]
+    def _load_names_cache(self) -> Dict[str, str]:
+        try:
+            with open(self._names_cache_path, 'r', encoding='utf-8') as f:
+                names = json.load(f)
+            logger.info(f"📂 已加载 {len(names)} 个股票名称缓存")
+            return names
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"股票名称缓存加载失败: {e}")
+            return {}
+    
+    def _save_names_cache(self, names: Dict[str, str]) -> Dict[str, str]:
+        """与磁盘上已有的名称合并后原子写入（在线程中调用；监控进程也写同一文件）"""
+        try:
+            with self._names_cache_lock:
+                return merge_json_file(self._names_cache_path, names)
+        except Exception as e:
+            logger.warning(f"股票名称缓存保存失败: {e}")
+            return {}
+    
+    async def _persist_names(self, names: Dict[str, str]):
+        """写盘新解析的名称，并吸收其他进程已写入的名称"""
+        merged = await asyncio.to_thread(self._save_names_cache, names)
+        for symbol, name in merged.items():
+            self.stock_names_cache.setdefault(symbol, name)
+    
+    async def _resolve_stock_name(self, symbol: str) -> Tuple[str, bool]:
+        """(名称, 是否为本次通过 pykrx 新解析的名称)"""
+        hit = self.stock_names_cache.get(symbol)
+        if hit is not None:
+            return hit, False
         
-        if symbol.startswith('KRW-') or symbol.startswith('USDT-'):
-            name = symbol.replace('KRW-', '').replace('USDT-', '')
+        if symbol.startswith(_CRYPTO_PREFIXES):
+            name = symbol.split('-', 1)[1]
             self.stock_names_cache[symbol] = name
-            return name
+            return name, False
         
         if PYKRX_AVAILABLE:
             try:
-                name = await asyncio.to_thread(
-                    pykrx_stock.get_market_ticker_name, symbol
+                name = await run_in_pool(
+                    self._pykrx_pool, pykrx_stock.get_market_ticker_name, symbol
                 )
                 if name:
                     self.stock_names_cache[symbol] = name
-                    return name
+                    return name, True
             except Exception as e:
                 logger.debug(f"pykrx 获取名称失败 {symbol}: {e}")
         
-        return symbol
+        return symbol, False
+    
+    async def get_stock_name(self, symbol: str) -> str:
+        name, fetched = await self._resolve_stock_name(symbol)
+        if fetched:
+            await self._persist_names({symbol: name})
+        return name
+    
+    async def get_stock_names(self, symbols) -> Dict[str, str]:
+        """并发解析多个名称（未缓存的 pykrx 查询同时进行，新名称整批写盘一次）"""
+        symbols = list(symbols)
+        results = await asyncio.gather(*[self._resolve_stock_name(symbol) for symbol in symbols])
+        fetched = {symbol: name for symbol, (name, new) in zip(symbols, results) if new}
+        if fetched:
+            await self._persist_names(fetched)
+        return {symbol: name for symbol, (name, _) in zip(symbols, results)}
     
     def format_stock_display(self, symbol: str, name: str) -> str:
         if symbol == name:
@@ -363,20 +764,17 @@ class OpenClawTelegramBot:
             return f"{name} ({symbol})"
     
     def _is_trading_time(self) -> bool:
-        now = datetime.now()
-        hour, minute = now.hour, now.minute
-        if hour < 8 or hour > 14:
-            return False
-        if hour == 14 and minute > 30:
-            return False
-        return True
+        # 08:00 ~ 14:30（含 14:30 这一分钟）
+        return dt_time(8, 0) <= datetime.now().time() < dt_time(14, 31)
     
     async def _get_current_prices(self) -> Dict[str, float]:
-        prices = {}
-        if self.tracker:
-            for symbol, pos in self.tracker.positions.items():
-                prices[symbol] = pos['avg_entry_price']
-        return prices
+        """
+        现价（symbol -> price）
+        
+        暂无实时报价来源：返回空字典，估值处统一回退到 avg_entry_price
+        （与逐个填入成本价结果相同，但不必每次复制一遍持仓）。
+        """
+        return {}
     
     # ==========================================
     # 告警功能（核心）
@@ -422,9 +820,7 @@ class OpenClawTelegramBot:
             logger.info(f"✅ 告警已发送: {display_name} {change:+.2f}%")
             
         except Exception as e:
-            logger.error(f"发送告警失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"发送告警失败: {e}")
     
     async def send_daily_report(self):
         """发送每日报告"""
@@ -439,16 +835,18 @@ class OpenClawTelegramBot:
             stocks = portfolio['stocks']
             crypto = portfolio['crypto']
             
+            names = await self.get_stock_names(self.tracker.positions)
+            
             stock_list = ""
             if stocks['count'] > 0:
-                for symbol in self.pm.get_stock_positions().keys():
-                    name = await self.get_stock_name(symbol)
+                for symbol in stocks['positions']:
+                    name = names.get(symbol, symbol)
                     stock_list += f"  • {name} ({symbol})\n"
             
             crypto_list = ""
             if crypto['count'] > 0:
-                for symbol in self.pm.get_crypto_positions().keys():
-                    name = await self.get_stock_name(symbol)
+                for symbol in crypto['positions']:
+                    name = names.get(symbol, symbol)
                     crypto_list += f"  • {name}\n"
             
             message = f"""
@@ -588,49 +986,41 @@ class OpenClawTelegramBot:
                 await update.message.reply_text("📭 当前无持仓")
                 return
             
-            message = "📊 当前持仓\n\n"
+            names = await self.get_stock_names(positions)
             
-            stock_positions = self.pm.get_stock_positions()
-            if stock_positions:
-                message += "🇰🇷 韩国股票:\n━━━━━━━━━━━━━━\n"
-                
-                for symbol, pos in stock_positions.items():
-                    name = await self.get_stock_name(symbol)
-                    display = self.format_stock_display(symbol, name)
+            # 每个持仓一段，最后按段切分发送（单条不超过 Telegram 上限）
+            parts = ["📊 当前持仓\n"]
+            
+            def _add_rows(bucket, qty_fmt: str, unit: str):
+                for symbol, pos in bucket.items():
+                    display = self.format_stock_display(symbol, names.get(symbol, symbol))
                     
                     curr_price = current_prices.get(symbol, pos['avg_entry_price'])
-                    curr_value = pos['quantity'] * curr_price
-                    pnl = curr_value - pos['total_cost']
-                    pnl_pct = (pnl / pos['total_cost']) * 100
+                    pnl = pos['quantity'] * curr_price - pos['total_cost']
+                    pnl_pct = (pnl / pos['total_cost'] * 100) if pos['total_cost'] else 0.0
                     
                     emoji = "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪"
                     
-                    message += f"\n{emoji} {display}\n"
-                    message += f"  {pos['quantity']:.0f}주 × ₩{curr_price:,}\n"
-                    message += f"  盈亏: ₩{_fws(pnl)} ({pnl_pct:+.2f}%)\n"
+                    parts.append(
+                        f"\n{emoji} {display}\n"
+                        f"  {pos['quantity']:{qty_fmt}}{unit} × ₩{curr_price:,}\n"
+                        f"  盈亏: ₩{_fws(pnl)} ({pnl_pct:+.2f}%)\n"
+                    )
+            
+            stock_positions = self.pm.get_stock_positions()
+            if stock_positions:
+                parts.append("\n🇰🇷 韩国股票:\n━━━━━━━━━━━━━━\n")
+                _add_rows(stock_positions, ".0f", "주")
             
             crypto_positions = self.pm.get_crypto_positions()
             if crypto_positions:
-                message += "\n🪙 加密货币:\n━━━━━━━━━━━━━━\n"
-                
-                for symbol, pos in crypto_positions.items():
-                    name = await self.get_stock_name(symbol)
-                    display = self.format_stock_display(symbol, name)
-                    
-                    curr_price = current_prices.get(symbol, pos['avg_entry_price'])
-                    curr_value = pos['quantity'] * curr_price
-                    pnl = curr_value - pos['total_cost']
-                    pnl_pct = (pnl / pos['total_cost']) * 100
-                    
-                    emoji = "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪"
-                    
-                    message += f"\n{emoji} {display}\n"
-                    message += f"  {pos['quantity']:.4f} × ₩{curr_price:,}\n"
-                    message += f"  盈亏: ₩{_fws(pnl)} ({pnl_pct:+.2f}%)\n"
+                parts.append("\n🪙 加密货币:\n━━━━━━━━━━━━━━\n")
+                _add_rows(crypto_positions, ".4f", "")
             
-            message += f"\n⏰ {datetime.now().strftime('%H:%M:%S')}"
+            parts.append(f"\n⏰ {datetime.now().strftime('%H:%M:%S')}")
             
-            await update.message.reply_text(message)
+            for chunk in _chunk_parts(parts):
+                await update.message.reply_text(chunk)
             
         except Exception as e:
             await update.message.reply_text(f"❌ {e}")
@@ -696,15 +1086,8 @@ class OpenClawTelegramBot:
             # 获取股票价格（使用pykrx）
             if PYKRX_AVAILABLE:
                 try:
-                    from datetime import datetime as dt, timedelta
-                    today = dt.now().strftime('%Y%m%d')
-                    yesterday = (dt.now() - timedelta(days=5)).strftime('%Y%m%d')
-                    
                     # 获取价格数据
-                    df = await asyncio.to_thread(
-                        pykrx_stock.get_market_ohlcv_by_date,
-                        yesterday, today, symbol
-                    )
+                    df = await self._get_recent_ohlcv(symbol)
                     
                     if df is None or df.empty:
                         await update.message.reply_text(f"❌ 无法获取 {symbol} 的价格数据")
@@ -728,7 +1111,7 @@ class OpenClawTelegramBot:
                     }
                     
                     # 计算简单技术指标
-                    prices = df['종가'].tolist()
+                    prices = df['종가'].to_numpy(dtype=np.float64)
                     rsi = self._calculate_simple_rsi(prices[-14:]) if len(prices) >= 14 else 50
                     
                     technical_indicators = {
@@ -760,9 +1143,7 @@ class OpenClawTelegramBot:
                     await update.message.reply_text(message)
                     
                 except Exception as e:
-                    logger.error(f"分析失败: {e}")
-                    import traceback
-                    traceback.print_exc()
+                    logger.exception(f"分析失败: {e}")
                     await update.message.reply_text(f"❌ 分析失败: {e}")
             else:
                 await update.message.reply_text("❌ pykrx 未安装，无法获取价格数据")
@@ -771,17 +1152,29 @@ class OpenClawTelegramBot:
             logger.error(f"Analysis error: {e}")
             await update.message.reply_text(f"❌ 分析出错: {e}")
     
-    def _calculate_simple_rsi(self, prices: list, period: int = 14) -> float:
+    async def _get_recent_ohlcv(self, symbol: str):
+        """近 5 日 OHLCV（pykrx），OHLCV_CACHE_TTL 内复用"""
+        cached = self._ohlcv_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
+        now = datetime.now()
+        df = await run_in_pool(
+            self._pykrx_pool, pykrx_stock.get_market_ohlcv_by_date,
+            (now - timedelta(days=5)).strftime('%Y%m%d'), now.strftime('%Y%m%d'), symbol
+        )
+        if df is not None and not df.empty:
+            self._ohlcv_cache.set(symbol, df)
+        return df
+    
+    def _calculate_simple_rsi(self, prices, period: int = 14) -> float:
         """简单RSI计算"""
         if len(prices) < period:
             return 50.0
         
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
+        deltas = np.diff(np.asarray(prices, dtype=np.float64))[-period:]
+        avg_gain = float(deltas[deltas > 0].sum()) / period
+        avg_loss = float(-deltas[deltas < 0].sum()) / period
         
         if avg_loss == 0:
             return 100.0
@@ -809,30 +1202,24 @@ class OpenClawTelegramBot:
                 await update.message.reply_text("📭 当前无持仓，无法生成建议")
                 return
             
-            # 分析每个持仓（最多3个）
-            count = 0
-            for symbol, pos in list(positions.items())[:3]:
-                count += 1
-                
-                name = await self.get_stock_name(symbol)
-                current_price = pos['avg_entry_price']
-                
-                # 简化的分析
-                advice = await self.ai_advisor.generate_trading_advice(
-                    symbol=symbol,
-                    name=name,
-                    current_price=current_price,
-                    price_data={'change_pct': 0, 'volume_ratio': 1.0},
-                    technical_indicators={'rsi': 50, 'macd': {'macd': 0}},
-                    sentiment={'overall_sentiment': 'neutral', 'score': 0, 'article_count': 0}
-                )
-                
-                message = self.ai_advisor.format_advice_for_telegram(advice)
-                await update.message.reply_text(message)
-                
-                # 短暂延迟避免刷屏
-                if count < len(positions):
-                    await asyncio.sleep(1)
+            # 分析每个持仓（最多3个）：并发生成建议，再按顺序逐条回复
+            selected = list(positions.items())[:3]
+            names = await self.get_stock_names(symbol for symbol, _ in selected)
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(self.ai_advisor.generate_trading_advice(
+                        symbol=symbol,
+                        name=names[symbol],
+                        current_price=pos['avg_entry_price'],
+                        price_data={'change_pct': 0, 'volume_ratio': 1.0},
+                        technical_indicators={'rsi': 50, 'macd': {'macd': 0}},
+                        sentiment={'overall_sentiment': 'neutral', 'score': 0, 'article_count': 0}
+                    ))
+                    for symbol, pos in selected
+                ]
+            
+            for task in tasks:
+                await update.message.reply_text(self.ai_advisor.format_advice_for_telegram(task.result()))
             
             if len(positions) > 3:
                 await update.message.reply_text(
@@ -873,71 +1260,29 @@ class OpenClawTelegramBot:
 
             # 卖出/平仓后若持仓清空，立即取消置顶（不等30秒轮询）
             # 若仍有持仓（例如只卖了一部分或还有其他币），则立即刷新置顶内容
-            has_pos = bool(
-                self.conversation_handler.tracker
-                and self.conversation_handler.tracker.positions
-            )
+            tracker = self.conversation_handler.tracker
+            has_pos = tracker is not None and bool(tracker.positions)
             
-            logger.debug(f"📌 检查持仓状态: has_pos={has_pos}, positions={self.conversation_handler.tracker.positions if self.conversation_handler.tracker else None}")
+            # 持仓字典只在 DEBUG 级别实际输出时才格式化
+            logger.opt(lazy=True).debug(
+                "📌 检查持仓状态: has_pos={}, positions={}",
+                lambda: has_pos, lambda: tracker.positions if tracker is not None else None,
+            )
             
             if not has_pos:
                 # 清仓：取消置顶
                 # 确保当前聊天也在扫描列表内（兼容机器人重启后内存丢失的场景）
                 current_chat_id = str(update.effective_chat.id)
-                _unpin_targets = list(dict.fromkeys(
-                    list(self.broadcast_ids) + [current_chat_id]
-                ))
+                _unpin_targets = self.broadcast_ids | {current_chat_id}
                 logger.info(f"📌 持仓已清空，准备取消置顶。targets={_unpin_targets}, _pinned_msg_ids={self._pinned_msg_ids}")
                 
-                for cid in _unpin_targets:
-                    mid = self._pinned_msg_ids.pop(cid, None)
-                    if mid is not None:
-                        try:
-                            await self.app.bot.unpin_chat_message(chat_id=cid, message_id=mid)
-                            logger.info(f"📌 平仓后立即取消置顶 cid={cid} mid={mid}")
-                        except Exception as _upe:
-                            logger.warning(f"取消置顶失败 cid={cid}: {_upe}，尝试删除消息")
-                            try:
-                                await self.app.bot.delete_message(chat_id=cid, message_id=mid)
-                                logger.info(f"📌 置顶消息已删除 cid={cid} mid={mid}")
-                            except Exception as _de:
-                                logger.warning(f"删除置顶消息也失败 cid={cid}: {_de}")
-                    else:
-                        # 没有记录的消息ID → 兜底方案
-                        logger.info(f"📌 _pinned_msg_ids无记录 cid={cid}，尝试多种方式取消置顶")
-                        try:
-                            # 私聊中：unpin_chat_message() 不传 message_id 会取消当前置顶的消息
-                            await self.app.bot.unpin_chat_message(chat_id=cid)
-                            logger.info(f"📌 已取消 cid={cid} 当前置顶消息（无message_id方式）")
-                        except Exception as _upe1:
-                            logger.debug(f"unpin_chat_message(无mid)失败: {_upe1}")
-                            # 群组中：使用 unpin_all
-                            try:
-                                await self.app.bot.unpin_all_chat_messages(chat_id=cid)
-                                logger.info(f"📌 已取消 cid={cid} 全部置顶（unpin_all）")
-                            except Exception as _upa:
-                                logger.warning(f"📌 所有取消置顶方式均失败 cid={cid}: {_upa}")
+                await asyncio.gather(*[self._reconcile_pin(cid, None) for cid in _unpin_targets], return_exceptions=True)
             else:
-                # 仍有持仓：立即刷新置顶内容
-                current_text = await self.conversation_handler._build_pinned_summary()
-                if current_text:
-                    for cid in self.broadcast_ids:
-                        mid = self._pinned_msg_ids.get(cid)
-                        if mid:
-                            try:
-                                await self.app.bot.edit_message_text(
-                                    chat_id=cid,
-                                    message_id=mid,
-                                    text=current_text
-                                )
-                                logger.info(f"📌 交易后立即刷新置顶 cid={cid} mid={mid}")
-                            except Exception as _ee:
-                                logger.warning(f"刷新置顶失败 cid={cid}: {_ee}")
+                # 仍有持仓：通知置顶循环尽快刷新（短时间内多笔交易合并为一次编辑）
+                self._pin_dirty.set()
             
         except Exception as e:
-            logger.error(f"处理消息失败: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"处理消息失败: {e}")
             await update.message.reply_text(
                 f"❌ 处理消息时出错：{str(e)[:300]}"
             )
@@ -949,44 +1294,38 @@ class OpenClawTelegramBot:
     async def run(self):
         logger.info("🚀 启动 Telegram Bot...")
         
-        # 自动读取环境变量中的代理配置（适配 WSL2/防火墙环境）
-        _proxy_url = os.environ.get('HTTPS_PROXY') or os.environ.get('HTTP_PROXY') or None
-        if _proxy_url:
-            logger.info(f"🔗 使用代理连接 Telegram: {_proxy_url}")
-            _request = HTTPXRequest(proxy=_proxy_url)
-            self.app = Application.builder().token(self.token).request(_request).build()
-        else:
-            self.app = Application.builder().token(self.token).build()
+        # 先绑定事件循环与告警队列：启动过程中 tracker 触发的告警也能跨线程入队
+        self._alert_loop = asyncio.get_running_loop()
+        self._alert_queue = asyncio.Queue(maxsize=self.ALERT_QUEUE_SIZE)
+        
+        if self._proxy_url:
+            logger.info(f"🔗 使用代理连接 Telegram: {self._proxy_url}")
+        # 不同 chat 的更新并发处理（慢命令不阻塞其他用户），同一 chat 内由 _per_chat 保序
+        self.app = Application.builder().bot(self.bot).concurrent_updates(True).build()
         
-        self.app.add_handler(CommandHandler("start", self.cmd_start))
-        self.app.add_handler(CommandHandler("status", self.cmd_status))
-        self.app.add_handler(CommandHandler("portfolio", self.cmd_portfolio))
-        self.app.add_handler(CommandHandler("positions", self.cmd_positions))
-        self.app.add_handler(CommandHandler("performance", self.cmd_performance))
-        self.app.add_handler(CommandHandler("analyze", self.cmd_analyze))
-        self.app.add_handler(CommandHandler("advice", self.cmd_advice))
+        self.app.add_handler(CommandHandler("start", self._per_chat(self.cmd_start)))
+        self.app.add_handler(CommandHandler("status", self._per_chat(self.cmd_status)))
+        self.app.add_handler(CommandHandler("portfolio", self._per_chat(self.cmd_portfolio)))
+        self.app.add_handler(CommandHandler("positions", self._per_chat(self.cmd_positions)))
+        self.app.add_handler(CommandHandler("performance", self._per_chat(self.cmd_performance)))
+        self.app.add_handler(CommandHandler("analyze", self._per_chat(self.cmd_analyze)))
+        self.app.add_handler(CommandHandler("advice", self._per_chat(self.cmd_advice)))
         
         # 添加消息处理器（处理所有非命令的文本消息）
-        self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
+        self.app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._per_chat(self.handle_message)))
         
         await self.app.initialize()
         await self.app.start()
-        await self.app.updater.start_polling()
+        # 长轮询：每次最多取 100 条（Telegram 上限），无间隔地立即发起下一轮；
+        # 启动时网络未就绪则一直重试（离线期间的指令不丢弃，仍会处理）
+        await self.app.updater.start_polling(
+            poll_interval=0.0, timeout=self.POLL_TIMEOUT, bootstrap_retries=-1
+        )
 
         logger.info("✅ Telegram Bot 运行中")
-
+        
         # ★ 已删除市场价格定时刷新任务 - 统一使用实时查询，无需缓存刷新 ★
 
-        # 启动 Alpaca WebSocket 实时美股推送（若已配置 ALPACA_API_KEY）
-        if self.us_hk_fetcher and getattr(self.us_hk_fetcher, 'alpaca_ws', None):
-            asyncio.create_task(self.us_hk_fetcher.start_alpaca_ws())
-            logger.info("📡 Alpaca WebSocket 实时美股推送任务已挂载")
-
-        # 启动 FUTU 港股实时推送（若 FutuOpenD 已在本机运行）
-        if self.us_hk_fetcher and getattr(self.us_hk_fetcher, 'futu_client', None):
-            self.us_hk_fetcher.start_futu_ws()
-            logger.info("📡 FUTU 港股实时推送任务已挂载")
-
         # 盈亏广播函数（供高频告警循环使用）
         async def _broadcast_pnl(text: str):
             try:
@@ -994,88 +1333,75 @@ class OpenClawTelegramBot:
             except Exception as _e:
                 logger.warning(f"盈亏推送失败: {_e}")
 
-        # 启动 +3%/-2% 高频盈亏告警循环（每30秒扫描，穿越阈值立即推送）
-        asyncio.create_task(
-            self.conversation_handler.start_pnl_alert_loop(_broadcast_pnl, interval=5)
-        )
-        logger.info("🔔 盈亏高频告警任务已挂载（每5秒扫描，+3%/-2%触发推送）")
-
-        # 启动置顶持仓动态循环（每30秒刷新，对所有广播用户发送/编辑置顶消息）
+        # 启动置顶持仓动态循环（交易后或每30秒刷新，对所有广播用户发送/编辑置顶消息）
         async def _pinned_position_loop():
-            logger.info("📌 置顶持仓动态循环已启动（每30秒刷新，广播全部用户）")
+            logger.info("📌 置顶持仓动态循环已启动（交易触发/每30秒刷新，广播全部用户）")
             while True:
-                await asyncio.sleep(30)
                 try:
-                    has_pos = bool(
-                        self.conversation_handler.tracker
-                        and self.conversation_handler.tracker.positions
-                    )
+                    await asyncio.wait_for(self._pin_dirty.wait(), timeout=self.PIN_REFRESH_INTERVAL)
+                    await asyncio.sleep(self.PIN_DEBOUNCE)
+                except asyncio.TimeoutError:
+                    pass
+                self._pin_dirty.clear()
+                try:
+                    tracker = self.conversation_handler.tracker
+                    has_pos = tracker is not None and bool(tracker.positions)
                     text = await self.conversation_handler._build_pinned_summary() if has_pos else None
+                    # 摘要不含末行时间戳，仅内容变化时才编辑
+                    digest = (
+                        hashlib.blake2b(text.rsplit('\n', 1)[0].encode(), digest_size=8).digest()
+                        if has_pos and text else b''
+                    )
 
-                    for cid in self.broadcast_ids:
-                        try:
-                            if has_pos and text:
-                                mid = self._pinned_msg_ids.get(cid)
-                                if mid is None:
-                                    # 首次：发送新消息并置顶
-                                    msg = await self.app.bot.send_message(chat_id=cid, text=text)
-                                    self._pinned_msg_ids[cid] = msg.message_id
-                                    try:
-                                        await self.app.bot.pin_chat_message(
-                                            chat_id=cid,
-                                            message_id=msg.message_id,
-                                            disable_notification=True,
-                                        )
-                                    except Exception as _pe:
-                                        logger.warning(f"置顶失败 cid={cid}: {_pe}")
-                                    logger.info(f"📌 置顶消息已创建 cid={cid} msg_id={msg.message_id}")
-                                else:
-                                    # 后续：编辑已有消息
-                                    try:
-                                        await self.app.bot.edit_message_text(
-                                            chat_id=cid,
-                                            message_id=mid,
-                                            text=text,
-                                        )
-                                    except Exception as _ee:
-                                        logger.warning(f"编辑置顶失败 cid={cid}: {_ee}，将重新创建")
-                                        self._pinned_msg_ids.pop(cid, None)
-                            else:
-                                # 无仓位：取消置顶并清除
-                                mid = self._pinned_msg_ids.pop(cid, None)
-                                if mid is not None:
-                                    try:
-                                        await self.app.bot.unpin_chat_message(chat_id=cid, message_id=mid)
-                                    except Exception:
-                                        pass
-                                    logger.info(f"📌 持仓清空，cid={cid} 置顶已取消")
-                                else:
-                                    # 无记录时兜底：强制取消所有置顶
-                                    try:
-                                        await self.app.bot.unpin_all_chat_messages(chat_id=cid)
-                                        logger.info(f"📌 持仓清空，cid={cid} unpin_all 兜底取消置顶")
-                                    except Exception as _upa:
-                                        logger.debug(f"unpin_all 兜底失败 cid={cid}: {_upa}")
-                        except Exception as _ce:
-                            logger.error(f"置顶循环 cid={cid} 异常: {_ce}")
+                    targets = [
+                        cid for cid in self.broadcast_ids
+                        if not (self._pin_last_hash.get(cid) == digest and (not digest or cid in self._pinned_msg_ids))
+                        and not self._rate_limiter.is_flood_limited(cid)
+                    ]
+                    results = await asyncio.gather(
+                        *[self._reconcile_pin(cid, text, digest) for cid in targets],
+                        return_exceptions=True,
+                    )
+                    for cid, r in zip(targets, results):
+                        if isinstance(r, Exception):
+                            logger.error(f"置顶循环 cid={cid} 异常: {r}")
                 except Exception as _le:
                     logger.error(f"置顶持仓循环异常: {_le}")
 
-        asyncio.create_task(_pinned_position_loop())
-        logger.info("📌 置顶持仓动态任务已挂载（每30秒刷新）")
-        
+        # 后台任务统一挂在 TaskGroup 下并发启动：任务引用有人持有（不会被回收），
+        # 任一任务异常退出时其余任务一并取消，随后走下面的清理流程
         try:
-            await self._broadcast("🤖 安诚科技 Ancent AI 已启动\n\n发送 /start 查看命令")
-        except:
-            pass
-        
-        try:
-            while True:
-                await asyncio.sleep(1)
-        except KeyboardInterrupt:
+            async with asyncio.TaskGroup() as tg:
+                # 告警消费任务（启动期间入队的告警此时开始发送）
+                tg.create_task(self._alert_drain())
+
+                # 启动 Alpaca WebSocket 实时美股推送（若已配置 ALPACA_API_KEY）
+                if self.us_hk_fetcher and getattr(self.us_hk_fetcher, 'alpaca_ws', None):
+                    tg.create_task(self.us_hk_fetcher.start_alpaca_ws())
+                    logger.info("📡 Alpaca WebSocket 实时美股推送任务已挂载")
+
+                # 启动 FUTU 港股实时推送（若 FutuOpenD 已在本机运行；自身在后台线程运行）
+                if self.us_hk_fetcher and getattr(self.us_hk_fetcher, 'futu_client', None):
+                    self.us_hk_fetcher.start_futu_ws()
+                    logger.info("📡 FUTU 港股实时推送任务已挂载")
+
+                # 启动 +3%/-2% 高频盈亏告警循环（美股/港股实时推送触发扫描，其余每5秒轮询）
+                tg.create_task(
+                    self.conversation_handler.start_pnl_alert_loop(_broadcast_pnl, interval=5)
+                )
+                logger.info("🔔 盈亏高频告警任务已挂载（实时推送触发/每5秒扫描，+3%/-2%触发推送）")
+
+                tg.create_task(_pinned_position_loop())
+                logger.info("📌 置顶持仓动态任务已挂载（交易触发/每30秒刷新）")
+
+                # 启动通知（_broadcast 内部逐个 chat 记录失败，不会中断其他任务）
+                tg.create_task(self._broadcast("🤖 安诚科技 Ancent AI 已启动\n\n发送 /start 查看命令"))
+        finally:
             await self.app.updater.stop()
             await self.app.stop()
             await self.app.shutdown()
+            # 公告监控等使用的共享 HTTP 连接池
+            await api_client.shutdown()
 
 
 if __name__ == '__main__':
@@ -5,10 +5,14 @@
 """
 import os
 import sys
+import json
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from loguru import logger
+import numpy as np
 
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -18,11 +22,17 @@ from pykrx import stock as pykrx_stock
 from crypto_fetcher import CryptoDataFetcher
 from telegram_bot_standalone import OpenClawTelegramBot
 from openclaw.skills.execution.position_tracker import PositionTracker
+from openclaw.utils.helpers import merge_json_file, run_in_pool, next_poll_delay
 
 
 class UnifiedMarketMonitor:
     """统一市场监控器"""
     
+    ALERT_COOLDOWN = 300  # 秒，同一标的两次告警的最小间隔
+    ALERT_INDEX_MAX = 4096  # 告警时间表超过此大小时清理冷却已过的标的
+    PYKRX_WORKERS = 4
+    MAX_BACKOFF = 300  # 秒，连续轮询失败时的最长等待
+    
     def __init__(
         self,
         stock_watch_list: List[str],
@@ -31,7 +41,8 @@ class UnifiedMarketMonitor:
         poll_interval: int = 30,
         alert_threshold: float = 2.0,
         tracker: Optional[PositionTracker] = None,
-        telegram_bot: Optional[OpenClawTelegramBot] = None
+        telegram_bot: Optional[OpenClawTelegramBot] = None,
+        names_cache_path: str = os.path.join('data', 'stock_names.json')
     ):
         self.stock_watch_list = stock_watch_list
         self.crypto_watch_mode = crypto_watch_mode
@@ -42,11 +53,18 @@ class UnifiedMarketMonitor:
         self.telegram_bot = telegram_bot
         
         self.crypto_fetcher = CryptoDataFetcher()
+        # pykrx 调用走固定大小的线程池：线程数不随关注列表增长，requests 会话得以复用连接
+        self._pykrx_pool = ThreadPoolExecutor(max_workers=self.PYKRX_WORKERS, thread_name_prefix='pykrx')
         
-        self.stock_names = {}
+        # 名称缓存落盘（与 Telegram bot 共用同一文件），重启后无需逐个查询 pykrx
+        self.names_cache_path = names_cache_path
+        self.stock_names = self._load_names_cache()
         self.crypto_names = {}
         
-        self.last_alert_time: Dict[str, datetime] = {}
+        # 上次告警时间（monotonic 秒）按固定下标存放：symbol -> 下标
+        self._alert_index: Dict[str, int] = {}
+        self._last_alert_ts = np.empty(0)
+        self._consec_fail = 0  # 连续失败轮询次数（成功即清零）
         
         self.stats = {
             'total_polls': 0,
@@ -60,13 +78,50 @@ class UnifiedMarketMonitor:
         
         logger.info("✅ 统一市场监控器初始化成功")
     
+    def _load_names_cache(self) -> Dict[str, str]:
+        try:
+            with open(self.names_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"股票名称缓存加载失败: {e}")
+            return {}
+    
+    def _save_names_cache(self):
+        """合并磁盘上已有的名称后原子写入（在线程中调用）"""
+        try:
+            merge_json_file(self.names_cache_path, self.stock_names)
+        except Exception as e:
+            logger.warning(f"股票名称缓存保存失败: {e}")
+    
+    async def _bootstrap_names(self):
+        """启动时并发预取关注列表中缺失的股票名称，告警路径不再同步查询 KRX"""
+        missing = [s for s in self.stock_watch_list if s not in self.stock_names]
+        if not missing:
+            return
+        
+        results = await asyncio.gather(
+            *[run_in_pool(self._pykrx_pool, pykrx_stock.get_market_ticker_name, s) for s in missing],
+            return_exceptions=True
+        )
+        found = 0
+        for symbol, name in zip(missing, results):
+            if isinstance(name, str) and name:
+                self.stock_names[symbol] = name
+                found += 1
+        
+        if found:
+            await asyncio.to_thread(self._save_names_cache)
+        logger.info(f"📂 股票名称预加载: {found}/{len(missing)}")
+    
     async def get_stock_name(self, symbol: str) -> str:
         if symbol in self.stock_names:
             return self.stock_names[symbol]
         
         try:
-            name = await asyncio.to_thread(
-                pykrx_stock.get_market_ticker_name, symbol
+            name = await run_in_pool(
+                self._pykrx_pool, pykrx_stock.get_market_ticker_name, symbol
             )
             if name:
                 self.stock_names[symbol] = name
@@ -84,8 +139,8 @@ class UnifiedMarketMonitor:
             today_str = today.strftime("%Y%m%d")
             week_ago_str = week_ago.strftime("%Y%m%d")
             
-            df = await asyncio.to_thread(
-                pykrx_stock.get_market_ohlcv_by_date,
+            df = await run_in_pool(
+                self._pykrx_pool, pykrx_stock.get_market_ohlcv_by_date,
                 week_ago_str, today_str, symbol
             )
             
@@ -117,15 +172,40 @@ class UnifiedMarketMonitor:
             return None
     
     async def get_all_stock_prices(self) -> Dict[str, Dict[str, Any]]:
-        tasks = [self.get_stock_price(symbol) for symbol in self.stock_watch_list]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if not self.stock_watch_list:
+            return {}
         
-        prices = {}
-        for symbol, result in zip(self.stock_watch_list, results):
-            if isinstance(result, dict):
-                prices[symbol] = result
+        # 一次请求取全市场当日行情（休市日自动回退到最近交易日），本地按关注列表切片
+        try:
+            df = await run_in_pool(
+                self._pykrx_pool, pykrx_stock.get_market_ohlcv_by_ticker,
+                datetime.now().strftime("%Y%m%d"), market="ALL", alternative=True
+            )
+        except Exception as e:
+            logger.debug(f"全市场行情获取失败: {e}")
+            return {}
         
-        return prices
+        if df.empty:
+            return {}
+        
+        rows = df.reindex(self.stock_watch_list)
+        rows = rows[rows['종가'] > 0]
+        timestamp = datetime.now().isoformat()
+        
+        return {
+            symbol: {
+                'symbol': symbol,
+                'type': 'stock',
+                'exchange': 'pykrx',
+                'price': int(row['종가']),
+                'change': round(float(row['등락률']), 2),
+                'volume': int(row['거래량']),
+                'high': int(row['고가']),
+                'low': int(row['저가']),
+                'timestamp': timestamp,
+            }
+            for symbol, row in rows.to_dict('index').items()
+        }
     
     async def get_crypto_watch_list(self) -> List[str]:
         if self.crypto_watch_mode == 'all':
@@ -195,23 +275,54 @@ class UnifiedMarketMonitor:
         
         return all_prices
     
+    def _alert_slots(self, symbols: List[str]) -> np.ndarray:
+        """symbols 对应的 _last_alert_ts 下标（新标的追加到末尾，初始为从未告警）"""
+        if len(self._alert_index) > self.ALERT_INDEX_MAX:
+            self._compact_alert_slots()
+        
+        index = self._alert_index
+        for symbol in symbols:
+            if symbol not in index:
+                index[symbol] = len(index)
+        
+        if len(index) > self._last_alert_ts.size:
+            grown = np.full(len(index), -np.inf)
+            grown[:self._last_alert_ts.size] = self._last_alert_ts
+            self._last_alert_ts = grown
+        
+        return np.fromiter((index[s] for s in symbols), dtype=np.intp, count=len(symbols))
+    
+    def _compact_alert_slots(self):
+        """只保留仍在冷却期内的标的（其余等同于从未告警），下标重新编号"""
+        live = time.monotonic() - self._last_alert_ts < self.ALERT_COOLDOWN
+        symbols = [s for s, i in self._alert_index.items() if live[i]]
+        self._last_alert_ts = self._last_alert_ts[[self._alert_index[s] for s in symbols]]
+        self._alert_index = {s: i for i, s in enumerate(symbols)}
+    
     def should_alert(self, symbol: str, change_pct: float) -> bool:
         if abs(change_pct) < self.alert_threshold:
             return False
         
-        if symbol in self.last_alert_time:
-            time_since_last = datetime.now() - self.last_alert_time[symbol]
-            if time_since_last < timedelta(minutes=5):
-                return False
-        
-        return True
+        i = self._alert_index.get(symbol)
+        return i is None or time.monotonic() - self._last_alert_ts[i] >= self.ALERT_COOLDOWN
     
     async def check_alerts(self, prices: Dict[str, Dict[str, Any]]):
-        for symbol, price_data in prices.items():
-            change_pct = price_data.get('change', 0)
-            
-            if self.should_alert(symbol, change_pct):
-                await self.send_alert(symbol, price_data)
+        if not prices:
+            return
+        
+        # 阈值与冷却判断对整批涨跌幅一次完成，只遍历需要告警的标的
+        symbols = list(prices)
+        changes = np.fromiter(
+            (p.get('change', 0) for p in prices.values()), dtype=np.float64, count=len(symbols)
+        )
+        slots = self._alert_slots(symbols)
+        mask = (np.abs(changes) >= self.alert_threshold) & (
+            time.monotonic() - self._last_alert_ts[slots] >= self.ALERT_COOLDOWN
+        )
+        
+        for i in np.flatnonzero(mask):
+            symbol = symbols[i]
+            await self.send_alert(symbol, prices[symbol])
     
     async def send_alert(self, symbol: str, price_data: Dict[str, Any]):
         try:
@@ -240,7 +351,7 @@ class UnifiedMarketMonitor:
                     f"₩{price:,} ({change:+.2f}%) [{price_data['exchange']}]"
                 )
             
-            self.last_alert_time[symbol] = datetime.now()
+            self._last_alert_ts[self._alert_slots([symbol])[0]] = time.monotonic()
             self.stats['alerts_sent'] += 1
             
         except Exception as e:
@@ -298,21 +409,22 @@ class UnifiedMarketMonitor:
         
         while True:
             try:
-                loop_start = datetime.now()
+                loop_start = time.monotonic()
                 
                 prices = await self.get_all_prices()
                 
                 if prices:
+                    self._consec_fail = 0
                     self.stats['successful_polls'] += 1
                     await self.check_alerts(prices)
                     self.display_current_prices(prices)
                 else:
+                    self._consec_fail += 1
                     self.stats['failed_polls'] += 1
                 
                 self.stats['total_polls'] += 1
                 
-                loop_duration = (datetime.now() - loop_start).total_seconds()
-                sleep_time = max(0, self.poll_interval - loop_duration)
+                sleep_time = next_poll_delay(self.poll_interval, self._consec_fail, loop_start, self.MAX_BACKOFF)
                 
                 if sleep_time > 0:
                     logger.info(f"⏳ 等待 {sleep_time:.1f}秒...")
@@ -322,11 +434,10 @@ class UnifiedMarketMonitor:
                 logger.info("🛑 收到停止信号")
                 break
             except Exception as e:
-                logger.error(f"监控循环错误: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"监控循环错误: {e}")
+                self._consec_fail += 1
                 self.stats['failed_polls'] += 1
-                await asyncio.sleep(self.poll_interval)
+                await asyncio.sleep(next_poll_delay(self.poll_interval, self._consec_fail, loop_start, self.MAX_BACKOFF))
     
     def display_stats(self):
         uptime = datetime.now() - self.stats['start_time']
@@ -359,11 +470,14 @@ class UnifiedMarketMonitor:
         logger.info(f"📱 Telegram: {'✅' if self.telegram_bot else '❌'}")
         logger.info("="*80)
         
+        await self._bootstrap_names()
+        
         try:
             await self.monitor_loop()
         except KeyboardInterrupt:
             logger.info("\n🛑 监控已停止")
         finally:
+            await self.crypto_fetcher.close()
             self.display_stats()
 
 
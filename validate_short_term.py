@@ -3,24 +3,84 @@
 Simple validation test for short-term trading strategies
 Does not require full dependencies - just validates structure
 """
-import ast
 import sys
+import tokenize
 from pathlib import Path
 
 
+ANALYSIS_DIR = Path("openclaw/skills/analysis")
+
+STRATEGY_METHODS = frozenset({
+    "_intraday_breakout_strategy",
+    "_minute_ma_cross_strategy",
+    "_momentum_reversal_strategy",
+    "_order_flow_anomaly_strategy",
+    "_news_momentum_strategy",
+    "generate_signals",
+    "aggregate_signals",
+})
+
+TA_METHODS = frozenset({
+    "calculate_fast_rsi",
+    "calculate_fast_macd",
+    "detect_intraday_high_low",
+    "detect_volume_anomaly",
+    "calculate_minute_mas",
+})
+
+RISK_METHODS = frozenset({
+    "calculate_tiered_take_profits",
+    "calculate_trailing_stop",
+    "check_intraday_limits",
+    "check_position_time_limit",
+    "record_trade",
+})
+
+ORDER_FLOW_METHODS = frozenset({
+    "analyze_order_book",
+    "detect_large_orders",
+    "analyze_tape",
+    "calculate_order_flow_strength",
+})
+
+BACKTEST_METHODS = frozenset({
+    "run_backtest",
+    "_calculate_metrics",
+    "_calculate_sharpe_ratio",
+    "_calculate_max_drawdown",
+})
+
+# (file, methods it must define), checked in order; the first failure stops main()
+CHECKS = [
+    (ANALYSIS_DIR / "strategy_engine.py", STRATEGY_METHODS),
+    (ANALYSIS_DIR / "technical_analysis.py", TA_METHODS),
+    (ANALYSIS_DIR / "risk_management.py", RISK_METHODS),
+    (ANALYSIS_DIR / "order_flow_analysis.py", ORDER_FLOW_METHODS),
+    (Path("openclaw/skills/backtesting/short_term_backtest.py"), BACKTEST_METHODS),
+]
+
+def defined_methods(filepath):
+    """Names of all (async) functions defined in a Python file"""
+    # Lexer-only scan: the name token right after `def` (covers `async def`
+    # and nested functions; strings and comments never yield NAME tokens)
+    names = set()
+    prev = None
+    with open(filepath, 'rb') as f:
+        for tok in tokenize.tokenize(f.readline):
+            if tok.type == tokenize.NAME:
+                if prev == 'def':
+                    names.add(tok.string)
+                prev = tok.string
+            else:
+                prev = None
+    return frozenset(names)
+
+
 def check_file_has_methods(filepath, required_methods):
     """Check if a Python file contains required methods"""
-    with open(filepath, 'r') as f:
-        tree = ast.parse(f.read())
-    
-    found_methods = set()
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef):
-            found_methods.add(node.name)
-    
-    missing = set(required_methods) - found_methods
+    missing = frozenset(required_methods) - defined_methods(filepath)
     if missing:
-        print(f"❌ {filepath.name} missing methods: {missing}")
+        print(f"❌ {filepath.name} missing methods: {set(missing)}")
         return False
     
     print(f"✅ {filepath.name} has all required methods")
@@ -28,67 +88,9 @@ def check_file_has_methods(filepath, required_methods):
 
 
 def main():
-    base_dir = Path("openclaw/skills/analysis")
-    
-    # Check strategy_engine.py
-    strategy_methods = [
-        "_intraday_breakout_strategy",
-        "_minute_ma_cross_strategy",
-        "_momentum_reversal_strategy",
-        "_order_flow_anomaly_strategy",
-        "_news_momentum_strategy",
-        "generate_signals",
-        "aggregate_signals"
-    ]
-    
-    if not check_file_has_methods(base_dir / "strategy_engine.py", strategy_methods):
-        return 1
-    
-    # Check technical_analysis.py
-    ta_methods = [
-        "calculate_fast_rsi",
-        "calculate_fast_macd",
-        "detect_intraday_high_low",
-        "detect_volume_anomaly",
-        "calculate_minute_mas"
-    ]
-    
-    if not check_file_has_methods(base_dir / "technical_analysis.py", ta_methods):
-        return 1
-    
-    # Check risk_management.py
-    risk_methods = [
-        "calculate_tiered_take_profits",
-        "calculate_trailing_stop",
-        "check_intraday_limits",
-        "check_position_time_limit",
-        "record_trade"
-    ]
-    
-    if not check_file_has_methods(base_dir / "risk_management.py", risk_methods):
-        return 1
-    
-    # Check order_flow_analysis.py
-    order_flow_methods = [
-        "analyze_order_book",
-        "detect_large_orders",
-        "analyze_tape",
-        "calculate_order_flow_strength"
-    ]
-    
-    if not check_file_has_methods(base_dir / "order_flow_analysis.py", order_flow_methods):
-        return 1
-    
-    # Check backtesting
-    backtest_methods = [
-        "run_backtest",
-        "_calculate_metrics",
-        "_calculate_sharpe_ratio",
-        "_calculate_max_drawdown"
-    ]
-    
-    if not check_file_has_methods(Path("openclaw/skills/backtesting/short_term_backtest.py"), backtest_methods):
-        return 1
+    for filepath, required_methods in CHECKS:
+        if not check_file_has_methods(filepath, required_methods):
+            return 1
     
     print("\n" + "="*60)
     print("✅ ALL VALIDATION CHECKS PASSED!")